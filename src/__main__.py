@@ -12,6 +12,14 @@ from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from dotenv import load_dotenv
 
+# uvloop is optional - the default asyncio loop is used without it
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    uvloop = None
+    UVLOOP_AVAILABLE = False
+
 from .orchestrator.hierarchical_workflow import HierarchicalCodebaseTranslatorWorkflow
 
 load_dotenv()
@@ -114,6 +122,7 @@ Examples:
     parser.add_argument("--source-language", help="Force source language detection (auto-detected if not specified)")
     parser.add_argument("--resume", action="store_true", help="Resume from previous checkpoint if available")
     parser.add_argument("--translator-only", action="store_true", help="Run only the translator agent on a specification file (skip documentation and analysis)")
+    parser.add_argument("--batch-mode", action="store_true", help="Submit translations through the OpenAI Batch API (about half the cost, results within 24h)")
     
     args = parser.parse_args()
     
@@ -151,7 +160,8 @@ Examples:
         config = load_config(args.config)
         config.update({
             'output_path': args.output or args.output_root or 'translated',
-            'dry_run': args.dry_run
+            'dry_run': args.dry_run,
+            'batch_mode': args.batch_mode
         })
         
         translator = TranslatorAgent(**config.get('translator', {
@@ -164,44 +174,54 @@ Examples:
             'target_language': args.target_language,
             'output_path': args.output or args.output_root or 'translated',
             'translation_state': {
-                'translated_modules': {},
+                'codes': {},
+                'output_paths': {},
                 'errors': []
             },
             'errors': []
         }
         
-        # Translate each module
-        for i, module_spec in enumerate(module_specs):
-            console.print(f"Translating module {i+1}/{len(module_specs)}: {module_spec.module_name}")
-            
-            # Set current module
-            state['current_module'] = module_spec
-            
+        if args.batch_mode:
+            console.print(f"Submitting {len(module_specs)} modules as a batch job...")
             try:
-                # Process with translator
-                state = await translator.process(state)
+                state = await translator.translate_all_batch(state, module_specs)
+            except ValueError as e:
+                console.print(f"[red]❌ {e}[/red]")
+                sys.exit(1)
+            if state.get('errors'):
+                console.print(f"[yellow]⚠️  Errors encountered: {state['errors']}[/yellow]")
+        else:
+            # Translate each module
+            for i, module_spec in enumerate(module_specs):
+                console.print(f"Translating module {i+1}/{len(module_specs)}: {module_spec.module_name}")
+                
+                # Set current module
+                state['current_module'] = module_spec
                 
-                if state.get('errors'):
-                    console.print(f"[yellow]⚠️  Errors encountered: {state['errors']}[/yellow]")
+                try:
+                    # Process with translator
+                    state = await translator.process(state)
                     
-            except Exception as e:
-                console.print(f"[red]❌ Error translating module {module_spec.module_name}: {e}[/red]")
-                state['errors'].append({"module": module_spec.module_name, "error": str(e)})
+                    if state.get('errors'):
+                        console.print(f"[yellow]⚠️  Errors encountered: {state['errors']}[/yellow]")
+                        
+                except Exception as e:
+                    console.print(f"[red]❌ Error translating module {module_spec.module_name}: {e}[/red]")
+                    state['errors'].append({"module": module_spec.module_name, "error": str(e)})
         
         # Save results
         translation_state = state.get('translation_state', {})
-        translated_modules = translation_state.get('translated_modules', {})
+        codes = translation_state.get('codes', {})
         
         console.print("[bold green]✅ Translation completed![/bold green]")
-        console.print(f"Translated {len(translated_modules)} modules")
+        console.print(f"Translated {len(codes)} modules")
         
         # Show results
-        for module_path, translation_data in translated_modules.items():
-            if isinstance(translation_data, dict) and 'code' in translation_data:
-                console.print(f"\n[blue]📄 {module_path}:[/blue]")
-                console.print("-" * 40)
-                code_preview = translation_data['code'][:200] + "..." if len(translation_data['code']) > 200 else translation_data['code']
-                console.print(code_preview)
+        for module_path, code in codes.items():
+            console.print(f"\n[blue]📄 {module_path}:[/blue]")
+            console.print("-" * 40)
+            code_preview = code[:200] + "..." if len(code) > 200 else code
+            console.print(code_preview)
         
         return
     
@@ -229,7 +249,8 @@ Examples:
         config.update({'output_path': './translated'})
     
     config.update({
-        'dry_run': args.dry_run
+        'dry_run': args.dry_run,
+        'batch_mode': args.batch_mode
     })
     
     console.print(f"[bold blue]🔄 Codebase Translator Starting...[/bold blue]")
@@ -295,7 +316,7 @@ Examples:
                 
                 if 'translation_state' in final_state and final_state['translation_state']:
                     translation = final_state['translation_state']
-                    console.print(f"🔄 Translated {len(translation.get('translated_modules', {}))} modules")
+                    console.print(f"🔄 Translated {len(translation.get('codes', {}))} modules")
                 
                 if result.get('errors'):
                     console.print(f"[yellow]⚠️  {len(result['errors'])} warnings/errors encountered[/yellow]")
@@ -315,4 +336,7 @@ Examples:
             sys.exit(1)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if UVLOOP_AVAILABLE:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
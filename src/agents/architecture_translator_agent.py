@@ -9,6 +9,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from .base_agent import BaseAgent
 from ..models.hierarchical_spec import ProjectSpecification, ProjectType
 from ..persistence.agent_checkpoint import CheckpointManager
+from ..utils.architecture_guidance import normalize_dependencies
 
 logger = logging.getLogger(__name__)
 
@@ -135,10 +136,13 @@ class ArchitectureTranslatorAgent(BaseAgent):
             )
 
             # Store in state - scaffolding files come directly from LLM response
+            dependency_names, dependency_purposes = normalize_dependencies(translation['dependencies'])
             state['architecture_translation'] = {
                 'source_framework': source_framework,
                 'target_framework': translation['target_framework'],
                 'dependencies': translation['dependencies'],
+                'dependency_names': dependency_names,
+                'dependency_purposes': dependency_purposes,
                 'project_structure': translation['project_structure'],
                 'architectural_mappings': translation['architectural_mappings'],
                 'scaffolding_files': translation.get('scaffolding_files', {}),
@@ -15,6 +15,13 @@ from typing import Callable
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def llm_model_name(llm: Any) -> str:
+    """Name of the model behind a chat model (or tool-bound wrapper), for keying cached responses."""
+    llm = getattr(llm, 'bound', llm)
+    return getattr(llm, 'model_name', None) or getattr(llm, 'model', None) or type(llm).__name__
+
+
 class BaseAgent(ABC):
     def __init__(
         self,
@@ -39,6 +46,11 @@ class BaseAgent(ABC):
             except Exception as e:
                 logger.warning(f"[{self.__class__.__name__}] Failed to bind tools: {e}")
                 # Continue without tools rather than failing
+
+    @property
+    def model_identity(self) -> str:
+        """Model name used to keep cached LLM responses separate per model."""
+        return llm_model_name(self.llm)
         
     async def _execute_with_retry(self, func: Callable, *args, **kwargs) -> Any:
         """Execute function with exponential backoff retry on rate limit errors."""
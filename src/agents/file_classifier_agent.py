@@ -194,7 +194,7 @@ class FileClassifierAgent(BaseAgent):
             lines = [line.strip() for line in content.split('\n')]
             code_lines = [
                 line for line in lines 
-                if line and not line.startswith('#') and not line.startswith('//')
+                if line and not line.startswith(('#', '//'))
             ]
             
             # If less than 5 lines of actual code, consider it trivial
@@ -220,7 +220,7 @@ class FileClassifierAgent(BaseAgent):
                 return FileType.SCHEMA
             
             # Check for config indicators
-            if content.strip().startswith('{') or content.strip().startswith('['):
+            if content.lstrip().startswith(('{', '[')):
                 # Likely JSON config
                 return FileType.CONFIG
             
@@ -2,26 +2,49 @@
 FunctionExtractor Agent - Extracts functions and classes from logic files.
 """
 import ast
+import asyncio
+import io
+import os
 import re
 from typing import Dict, List, Any, Optional, Tuple
-from pathlib import Path
 from langchain_core.prompts import ChatPromptTemplate
 from .base_agent import BaseAgent
 from ..models.hierarchical_spec import (
     FileType, FunctionInfo, ClassInfo, FileSpecification
 )
 from ..persistence.agent_checkpoint import CheckpointManager
+from ..persistence.response_cache import ResponseCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever extraction output changes (AST rendering or the LLM prompt) so cached results are not reused
+EXTRACTOR_VERSION = "1"
+
+# Decorator rendering keyed on exact node type; calls are rendered without arguments
+_DECORATOR_RENDERERS = {
+    ast.Name: lambda d: f"@{d.id}",
+    ast.Attribute: lambda d: f"@{ast.unparse(d)}",
+    ast.Call: lambda d: f"@{d.func.id}" if isinstance(d.func, ast.Name) else f"@{ast.unparse(d.func)}",
+}
+
 
 class FunctionExtractorAgent(BaseAgent):
     """Extracts functions and classes from code files for granular analysis."""
     
-    def __init__(self, checkpoint_manager: Optional[CheckpointManager] = None, **kwargs):
+    def __init__(
+        self,
+        checkpoint_manager: Optional[CheckpointManager] = None,
+        response_cache: Optional[ResponseCache] = None,
+        **kwargs
+    ):
         super().__init__(**kwargs)
         self.checkpoint_manager = checkpoint_manager
+        # Extraction results are keyed by file content, so they survive across workflows
+        if response_cache is None and checkpoint_manager:
+            response_cache = ResponseCache.for_checkpoint_dir(checkpoint_manager.checkpoint_dir)
+        self.response_cache = response_cache
+        self._stats = self._empty_stats()
     
     def get_prompt(self) -> ChatPromptTemplate:
         """Prompt for language-agnostic function extraction."""
@@ -83,7 +106,7 @@ class FunctionExtractorAgent(BaseAgent):
     async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Extract functions from all logic files."""
         file_specs = state.get('file_specs', [])
-        root_path = Path(state.get('root_path', '.'))
+        root_str = str(state.get('root_path', '.'))
         
         # Filter for logic files that need analysis
         logic_files = [
@@ -94,54 +117,76 @@ class FunctionExtractorAgent(BaseAgent):
         # Initialize or load checkpoint
         extracted_functions = {}
         processed_files = []
+        self._stats = self._empty_stats()
         
         if self.checkpoint_manager:
             checkpoint = self.checkpoint_manager.load_agent_state("function_extractor")
             if checkpoint:
+                extracted_functions = checkpoint.state.get('extracted_functions', {})
+                if 'stats' in checkpoint.state:
+                    self._stats.update(checkpoint.state['stats'])
+                else:
+                    # Checkpoints written before running counters existed only hold the results
+                    for functions_data in extracted_functions.values():
+                        self._record_stats(functions_data)
+
                 if checkpoint.agent_phase == "completed":
                     logger.info("Function extraction already completed")
-                    state['extracted_functions'] = checkpoint.state.get('extracted_functions', {})
+                    state['extracted_functions'] = extracted_functions
+                    state['function_extraction_stats'] = checkpoint.state.get('stats') or self._generate_extraction_stats()
                     return state
                 
-                extracted_functions = checkpoint.state.get('extracted_functions', {})
                 processed_files = checkpoint.state.get('processed_files', [])
                 logger.info(f"Resuming function extraction, {len(processed_files)} files already processed")
         
         self.log_action(f"Extracting functions from {len(logic_files)} logic files")
         
+        # Bound concurrent LLM extractions; Python files are parsed locally via AST
+        max_concurrent = self.rate_limit_config.get('max_concurrent_requests', 2)
+        llm_semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def extract_file(file_spec: FileSpecification) -> Tuple[FileSpecification, Dict[str, Any]]:
+            full_path = os.path.join(root_str, file_spec.file_path)
+            
+            # Extract functions based on language
+            if file_spec.language == 'python':
+                return file_spec, await self._extract_python_functions(full_path)
+            
+            # Use LLM for other languages
+            async with llm_semaphore:
+                return file_spec, await self._extract_functions_with_llm(
+                    full_path,
+                    file_spec.file_path,
+                    file_spec.language
+                )
+        
         try:
-            for i, file_spec in enumerate(logic_files):
-                if file_spec.file_path in processed_files:
-                    continue
-                
-                full_path = root_path / file_spec.file_path
-                
-                # Extract functions based on language
-                if file_spec.language == 'python':
-                    functions_data = await self._extract_python_functions(full_path)
-                else:
-                    # Use LLM for other languages
-                    functions_data = await self._extract_functions_with_llm(
-                        full_path, 
-                        file_spec.file_path,
-                        file_spec.language
-                    )
+            pending_files = [
+                file_spec for file_spec in logic_files
+                if file_spec.file_path not in processed_files
+            ]
+            tasks = [extract_file(file_spec) for file_spec in pending_files]
+            
+            for i, task in enumerate(asyncio.as_completed(tasks)):
+                file_spec, functions_data = await task
                 
                 if functions_data:
                     extracted_functions[file_spec.file_path] = functions_data
                     processed_files.append(file_spec.file_path)
+                    self._record_stats(functions_data)
                     
                     # Update file spec with extracted info
                     file_spec.functions = functions_data.get('functions', [])
                     file_spec.classes = functions_data.get('classes', [])
                 
-                # Checkpoint every 10 files
+                # Checkpoint every 10 completed files
                 if (i + 1) % 10 == 0 and self.checkpoint_manager:
                     self.checkpoint_manager.save_agent_state(
                         "function_extractor",
                         {
                             "extracted_functions": extracted_functions,
-                            "processed_files": processed_files
+                            "processed_files": processed_files,
+                            "stats": self._stats
                         },
                         {
                             "processed": len(processed_files),
@@ -154,9 +199,13 @@ class FunctionExtractorAgent(BaseAgent):
                               f"{len(functions_data.get('functions', []))} functions, "
                               f"{len(functions_data.get('classes', []))} classes")
             
+            # Files finish in completion order; sort so state, checkpoints and downstream prompts are stable
+            extracted_functions = dict(sorted(extracted_functions.items()))
+            processed_files.sort()
+            
             # Save to state
             state['extracted_functions'] = extracted_functions or {}
-            state['function_extraction_stats'] = self._generate_extraction_stats(extracted_functions)
+            state['function_extraction_stats'] = self._generate_extraction_stats()
             
             # Mark as completed
             if self.checkpoint_manager:
@@ -164,7 +213,8 @@ class FunctionExtractorAgent(BaseAgent):
                     "function_extractor",
                     {
                         "extracted_functions": extracted_functions,
-                        "processed_files": processed_files
+                        "processed_files": processed_files,
+                        "stats": self._generate_extraction_stats()
                     },
                     {"status": "completed", "total_processed": len(processed_files)},
                     phase="completed"
@@ -179,13 +229,23 @@ class FunctionExtractorAgent(BaseAgent):
         
         return state
     
-    async def _extract_python_functions(self, file_path: Path) -> Dict[str, Any]:
+    async def _extract_python_functions(self, file_path: str) -> Dict[str, Any]:
         """Extract functions from Python files using AST."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            
+            cache_key = ResponseCache.make_key(EXTRACTOR_VERSION, 'python-ast', raw)
+            cached = await self._get_cached(cache_key)
+            if cached is not None:
+                return cached
             
-            tree = ast.parse(content)
+            tree = ast.parse(raw.decode('utf-8'))
+            
+            # Annotate parents once so method detection is O(1) per function
+            for parent in ast.walk(tree):
+                for child in ast.iter_child_nodes(parent):
+                    child._parent = parent
             
             functions = []
             classes = []
@@ -193,7 +253,7 @@ class FunctionExtractorAgent(BaseAgent):
             for node in ast.walk(tree):
                 if isinstance(node, ast.FunctionDef) or isinstance(node, ast.AsyncFunctionDef):
                     # Check if it's a method (has a parent class)
-                    parent_class = self._find_parent_class(tree, node)
+                    parent_class = self._find_parent_class(node)
                     
                     if not parent_class:  # Only add standalone functions
                         functions.append(FunctionInfo(
@@ -242,23 +302,21 @@ class FunctionExtractorAgent(BaseAgent):
                         decorators=[self._decorator_to_string(d) for d in node.decorator_list]
                     ))
             
-            return {
+            result = {
                 "functions": [f.dict() for f in functions],
                 "classes": [c.dict() for c in classes]
             }
+            await self._set_cached(cache_key, result)
+            return result
             
         except Exception as e:
             logger.error(f"Error parsing Python file {file_path}: {e}")
             return {"functions": [], "classes": []}
     
-    def _find_parent_class(self, tree: ast.AST, func_node: ast.AST) -> Optional[str]:
-        """Find if a function is inside a class."""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                for item in node.body:
-                    if item is func_node:
-                        return node.name
-        return None
+    def _find_parent_class(self, func_node: ast.AST) -> Optional[str]:
+        """Find if a function is inside a class (requires the parent annotation pass)."""
+        parent = getattr(func_node, '_parent', None)
+        return parent.name if isinstance(parent, ast.ClassDef) else None
     
     def _get_function_signature(self, node: ast.FunctionDef) -> str:
         """Extract function signature."""
@@ -277,12 +335,8 @@ class FunctionExtractorAgent(BaseAgent):
     
     def _decorator_to_string(self, decorator: ast.AST) -> str:
         """Convert decorator AST to string."""
-        if isinstance(decorator, ast.Name):
-            return f"@{decorator.id}"
-        elif isinstance(decorator, ast.Call):
-            if isinstance(decorator.func, ast.Name):
-                return f"@{decorator.func.id}"
-        return "@unknown"
+        renderer = _DECORATOR_RENDERERS.get(type(decorator))
+        return renderer(decorator) if renderer else "@unknown"
     
     def _get_base_name(self, base: ast.AST) -> str:
         """Get base class name from AST."""
@@ -294,29 +348,42 @@ class FunctionExtractorAgent(BaseAgent):
     
     async def _extract_functions_with_llm(
         self, 
-        file_path: Path, 
+        file_path: str, 
         relative_path: str,
         language: str
     ) -> Dict[str, Any]:
         """Use LLM to extract functions for non-Python languages."""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                # Read file with line numbers for accurate extraction
-                lines = f.readlines()
-                
-                # Add line numbers to help LLM identify positions
-                numbered_code = ""
-                for i, line in enumerate(lines[:500], 1):  # Limit to first 500 lines
-                    numbered_code += f"{i:4d}: {line}"
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            
+            # Identical content in the same language yields the same extraction from the same model
+            cache_key = ResponseCache.make_key(EXTRACTOR_VERSION, self.model_identity, language, raw)
+            cached = await self._get_cached(cache_key)
+            if cached is not None:
+                return cached
+            
+            # Read file with line numbers for accurate extraction; split like text-mode readlines()
+            # so form feeds and Unicode separators do not shift the numbering
+            lines = io.StringIO(raw.decode('utf-8', errors='ignore'), newline=None).readlines()
+            
+            # Add line numbers to help LLM identify positions
+            numbered_code = ''.join(
+                f"{i:4d}: {line}" for i, line in enumerate(lines[:500], 1)  # Limit to first 500 lines
+            )
             
             prompt = self.get_prompt()
             chain = prompt | self.llm
             
-            response = await chain.ainvoke({
-                "file_path": relative_path,
-                "language": language,
-                "code": numbered_code
-            })
+            # Use retry wrapper so transient rate limits don't drop the file
+            response = await self._execute_with_retry(
+                chain.ainvoke,
+                {
+                    "file_path": relative_path,
+                    "language": language,
+                    "code": numbered_code
+                }
+            )
             
             # Parse response
             content = response.content.strip()
@@ -355,32 +422,50 @@ class FunctionExtractorAgent(BaseAgent):
                 class_data['methods'] = methods
                 classes.append(ClassInfo(**class_data))
             
-            return {
+            result = {
                 "functions": [f.dict() for f in functions],
                 "classes": [c.dict() for c in classes]
             }
+            await self._set_cached(cache_key, result)
+            return result
             
         except Exception as e:
             logger.error(f"Error extracting functions with LLM for {file_path}: {e}")
             return {"functions": [], "classes": []}
     
-    def _generate_extraction_stats(self, extracted_functions: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate statistics about extracted functions."""
-        total_functions = 0
-        total_classes = 0
-        total_methods = 0
-        
-        for file_data in extracted_functions.values():
-            total_functions += len(file_data.get('functions', []))
-            classes = file_data.get('classes', [])
-            total_classes += len(classes)
-            for class_data in classes:
-                total_methods += len(class_data.get('methods', []))
-        
+    async def _get_cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Look up a previous extraction result by content hash, off the event loop."""
+        if not self.response_cache:
+            return None
+        return await asyncio.to_thread(self.response_cache.get, "function_extractor", cache_key)
+    
+    async def _set_cached(self, cache_key: str, result: Dict[str, Any]):
+        """Persist an extraction result by content hash, off the event loop."""
+        if self.response_cache:
+            await asyncio.to_thread(self.response_cache.set, "function_extractor", cache_key, result)
+    
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        """Zeroed running counters for extraction statistics."""
+        return {
+            "files_processed": 0,
+            "total_functions": 0,
+            "total_classes": 0,
+            "total_methods": 0
+        }
+    
+    def _record_stats(self, functions_data: Dict[str, Any]):
+        """Add one file's extraction results to the running counters."""
+        classes = functions_data.get('classes', [])
+        self._stats["files_processed"] += 1
+        self._stats["total_functions"] += len(functions_data.get('functions', []))
+        self._stats["total_classes"] += len(classes)
+        for class_data in classes:
+            self._stats["total_methods"] += len(class_data.get('methods', []))
+    
+    def _generate_extraction_stats(self) -> Dict[str, Any]:
+        """Generate statistics about extracted functions from the running counters."""
         return {
-            "files_processed": len(extracted_functions),
-            "total_functions": total_functions,
-            "total_classes": total_classes,
-            "total_methods": total_methods,
-            "total_code_units": total_functions + total_methods
-        }
\ No newline at end of file
+            **self._stats,
+            "total_code_units": self._stats["total_functions"] + self._stats["total_methods"]
+        }
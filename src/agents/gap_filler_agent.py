@@ -2,25 +2,185 @@
 GapFillerAgent - Identifies and implements missing functionality in translated code.
 """
 import asyncio
-from typing import Dict, List, Any, Optional, Set
+import functools
+from typing import Dict, List, Any, Optional, Set, FrozenSet, Tuple
 from pathlib import Path
 from langchain_core.prompts import ChatPromptTemplate
 from .base_agent import BaseAgent
 from ..models.specification import ModuleSpecification
 import logging
 import ast
+import io
 import re
+import tokenize
+
+# RE2 is optional - it guarantees linear-time matching on large translated files
+try:
+    import re2 as regex_engine
+    RE2_AVAILABLE = True
+except ImportError:
+    regex_engine = re
+    RE2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+
+def _compile(pattern: str) -> Any:
+    """Compile with RE2 when available; RE2 takes no re flag constants, so use inline flags like (?m)."""
+    return regex_engine.compile(pattern)
+
+
+# Precompiled extraction patterns; alternatives are unioned so each source is scanned once
+_GO_FUNC_RE = _compile(r'func\s+(\w+)\s*\(')
+_JS_FUNC_RE = _compile(
+    r'function\s+(\w+)\s*\('
+    r'|const\s+(\w+)\s*=\s*\('
+    r'|(\w+)\s*:\s*function\s*\('
+)
+_IMPORT_RES = {
+    'javascript': _compile(
+        r'import\s+.*from\s+["\']([^"\']+)["\']'
+        r'|const\s+\w+\s*=\s*require\s*\(\s*["\']([^"\']+)["\']'
+    ),
+}
+# Single-line Go import, optionally aliased: import foo "path/to/foo"
+_GO_SINGLE_IMPORT_RE = _compile(r'(?m)^import\s+(?:[\w.]+\s+)?"([^"]+)"')
+_ENDPOINT_RES = {
+    # Flask/Django style routes
+    'python': _compile(
+        r'@app\.route\s*\(\s*["\']([^"\']+)["\']'
+        r'|path\s*\(\s*["\']([^"\']+)["\']'
+    ),
+    # Gorilla mux or standard HTTP routes
+    'go': _compile(r'Handle(?:Func)?\s*\(\s*["\']([^"\']+)["\']'),
+    # Express.js routes
+    'javascript': _compile(r'app\.(?:get|post|put|delete)\s*\(\s*["\']([^"\']+)["\']'),
+}
+
+
+def _collect_groups(pattern: Any, code: str) -> Set[str]:
+    """Collect every non-empty capture group across all matches of a unioned pattern."""
+    found = set()
+    for match in pattern.finditer(code):
+        found.update(group for group in match.groups() if group)
+    return found
+
+
+def _extract_go_imports(code: str) -> Set[str]:
+    """Extract Go import paths from import declarations only, not every string literal."""
+    imports = set(_GO_SINGLE_IMPORT_RE.findall(code))
+    start = code.find('import (')
+    while start != -1:
+        end = code.find(')', start)
+        if end == -1:
+            break
+        # Only a declaration if it starts a line
+        if start == 0 or code[start - 1] == '\n':
+            imports.update(code[start:end].split('"')[1::2])
+        start = code.find('import (', end)
+    return imports
+
+
+def _index_specs(module_specs: List[ModuleSpecification]) -> Dict[str, ModuleSpecification]:
+    """Index specifications by file path; the first spec wins for a duplicated path."""
+    spec_by_path: Dict[str, ModuleSpecification] = {}
+    for spec in module_specs:
+        spec_by_path.setdefault(spec.file_path, spec)
+    return spec_by_path
+
+
+# AST fields holding nested statement lists (class/function bodies, branches, handlers, match cases)
+_STATEMENT_BLOCK_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+
+
+class _PythonDefinitionCollector(ast.NodeVisitor):
+    """Collects function names and imported top-level modules from a Python AST.
+
+    Definitions and imports are statements, so only statement blocks are
+    traversed; expression subtrees (the bulk of any AST) are never visited.
+    """
+
+    def __init__(self):
+        self.functions: Set[str] = set()
+        self.imports: Set[str] = set()
+
+    def generic_visit(self, node: ast.AST):
+        for field_name in _STATEMENT_BLOCK_FIELDS:
+            block = getattr(node, field_name, None)
+            if isinstance(block, list):
+                for child in block:
+                    self.visit(child)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.functions.add(node.name)
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Import(self, node: ast.Import):
+        # import a.b.c as d -> a
+        self.imports.update(alias.name.split('.')[0] for alias in node.names)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        # from a.b import c -> a
+        if node.module:
+            self.imports.add(node.module.split('.')[0])
+
+
+def _scan_python_tokens(code: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """Recover (function names, imported modules) from tokens when the source does not parse."""
+    functions = set()
+    imports = set()
+    previous = None
+    in_from_clause = False
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type == tokenize.NAME:
+                if previous == 'def':
+                    functions.add(token.string)
+                elif previous == 'from' or (previous == 'import' and not in_from_clause):
+                    imports.add(token.string)
+                if token.string == 'from':
+                    in_from_clause = True
+                previous = token.string
+            elif token.type not in (tokenize.NL, tokenize.COMMENT):
+                if token.type == tokenize.NEWLINE:
+                    in_from_clause = False
+                previous = None
+    except (tokenize.TokenError, IndentationError):
+        # Keep whatever was recovered before the tokenizer gave up
+        pass
+    return frozenset(functions), frozenset(imports)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_python_once(code: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """Parse Python source once, returning (function names, imported top-level modules)."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        # Translated code is often not quite valid; fall back to the token stream
+        return _scan_python_tokens(code)
+
+    collector = _PythonDefinitionCollector()
+    collector.visit(tree)
+    return frozenset(collector.functions), frozenset(collector.imports)
+
+
 class GapFillerAgent(BaseAgent):
     """Analyzes translated code and fills in missing functionality."""
 
     def __init__(self, checkpoint_manager=None, **kwargs):
         super().__init__(**kwargs)
         self.checkpoint_manager = checkpoint_manager
+        # Static prompt prefix is built once so every call shares an identical,
+        # provider-cacheable system message
+        self._prompt = self._build_prompt()
 
     def get_prompt(self) -> ChatPromptTemplate:
+        return self._prompt
+
+    def _build_prompt(self) -> ChatPromptTemplate:
         return ChatPromptTemplate.from_messages([
             ("system", """You are an expert code completion agent that identifies and implements missing functionality.
 
@@ -50,59 +210,67 @@ Generate the missing code in {target_language} that integrates seamlessly with t
 
     async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze translated code and fill in missing functionality."""
-        translated_modules = state.get('translation_state', {}).get('translated_modules', {})
+        codes = state.get('translation_state', {}).get('codes', {})
         module_specs = state.get('module_specifications', [])
 
-        if not translated_modules:
+        if not codes:
             logger.warning("No translated modules found to analyze")
             return state
 
-        self.log_action(f"Analyzing {len(translated_modules)} translated modules for gaps")
+        self.log_action(f"Analyzing {len(codes)} translated modules for gaps")
 
         gaps_found = []
         filled_gaps = []
+        target_language = state.get('target_language', 'python')
+        spec_by_path = _index_specs(module_specs)
 
-        try:
-            for module_path, translation_data in translated_modules.items():
-                if not isinstance(translation_data, dict) or 'code' not in translation_data:
-                    continue
-
-                existing_code = translation_data['code']
-                spec = self._find_matching_spec(module_path, module_specs)
+        # Cap in-flight gap-fill LLM calls while modules are processed concurrently
+        max_concurrent = self.rate_limit_config.get('max_concurrent_requests', 2)
+        semaphore = asyncio.Semaphore(max_concurrent)
 
-                if not spec:
-                    logger.warning(f"No specification found for {module_path}")
-                    continue
+        async def handle_module(module_path: str, existing_code: str) -> List[Dict[str, Any]]:
+            spec = spec_by_path.get(module_path)
 
-                # Analyze gaps in this module
-                module_gaps = await self._analyze_module_gaps(
-                    existing_code, spec, state.get('target_language', 'python')
-                )
+            if not spec:
+                logger.warning(f"No specification found for {module_path}")
+                return []
 
-                if module_gaps:
-                    gaps_found.extend(module_gaps)
+            # Analyze gaps in this module
+            module_gaps = await self._analyze_module_gaps(existing_code, spec, target_language)
 
-                    # Fill the gaps
+            if module_gaps:
+                # Fill the gaps
+                async with semaphore:
                     filled_code = await self._fill_module_gaps(
-                        existing_code, spec, module_gaps, state.get('target_language', 'python')
+                        existing_code, spec, module_gaps, target_language
                     )
 
-                    if filled_code and filled_code != existing_code:
-                        # Update the translated code
-                        translation_data['code'] = filled_code
-                        filled_gaps.append({
-                            'module': module_path,
-                            'gaps_filled': len(module_gaps)
-                        })
+                if filled_code and filled_code != existing_code:
+                    # Update the translated code
+                    codes[module_path] = filled_code
+                    filled_gaps.append({
+                        'module': module_path,
+                        'gaps_filled': len(module_gaps)
+                    })
+
+                    logger.info(f"Filled {len(module_gaps)} gaps in {module_path}")
 
-                        logger.info(f"Filled {len(module_gaps)} gaps in {module_path}")
+            return module_gaps
+
+        try:
+            results = await asyncio.gather(*[
+                handle_module(module_path, existing_code)
+                for module_path, existing_code in codes.items()
+            ])
+            for module_gaps in results:
+                gaps_found.extend(module_gaps)
 
             # Update state
             state['gaps_found'] = gaps_found
             state['filled_gaps'] = filled_gaps
             state['gap_analysis_stats'] = {
                 'total_gaps_found': len(gaps_found),
-                'modules_analyzed': len(translated_modules),
+                'modules_analyzed': len(codes),
                 'modules_with_gaps': len([g for g in filled_gaps if g['gaps_filled'] > 0])
             }
 
@@ -117,10 +285,7 @@ Generate the missing code in {target_language} that integrates seamlessly with t
 
     def _find_matching_spec(self, module_path: str, module_specs: List[ModuleSpecification]) -> Optional[ModuleSpecification]:
         """Find the specification that matches the module path."""
-        for spec in module_specs:
-            if spec.file_path == module_path:
-                return spec
-        return None
+        return _index_specs(module_specs).get(module_path)
 
     async def _analyze_module_gaps(
         self,
@@ -132,29 +297,31 @@ Generate the missing code in {target_language} that integrates seamlessly with t
         gaps = []
 
         try:
-            # Parse existing code based on language
-            if target_language == 'python':
-                existing_functions = self._extract_python_functions(existing_code)
-            elif target_language == 'go':
-                existing_functions = self._extract_go_functions(existing_code)
-            elif target_language == 'javascript':
-                existing_functions = self._extract_js_functions(existing_code)
-            else:
-                existing_functions = set()
-
-            # Check for missing functions
-            spec_functions = set()
-            for operation in spec.operations:
-                if operation.operation and operation.operation != 'unknown':
-                    spec_functions.add(operation.operation)
-
-            missing_functions = spec_functions - existing_functions
-            for func_name in missing_functions:
-                gaps.append({
-                    'type': 'function',
-                    'name': func_name,
-                    'description': f'Missing function: {func_name}'
-                })
+            # Only parse the existing code if the spec names any functions
+            spec_functions = {
+                operation.operation for operation in spec.operations
+                if operation.operation and operation.operation != 'unknown'
+            }
+
+            if spec_functions:
+                # Parse existing code based on language
+                if target_language == 'python':
+                    existing_functions = self._extract_python_functions(existing_code)
+                elif target_language == 'go':
+                    existing_functions = self._extract_go_functions(existing_code)
+                elif target_language == 'javascript':
+                    existing_functions = self._extract_js_functions(existing_code)
+                else:
+                    existing_functions = set()
+
+                # Check for missing functions
+                missing_functions = spec_functions - existing_functions
+                for func_name in missing_functions:
+                    gaps.append({
+                        'type': 'function',
+                        'name': func_name,
+                        'description': f'Missing function: {func_name}'
+                    })
 
             # Check for missing imports
             if spec.dependencies:
@@ -170,9 +337,12 @@ Generate the missing code in {target_language} that integrates seamlessly with t
                     })
 
             # Check for missing endpoints/routes (for web apps)
-            if spec.module_type in ['web_api', 'web_app']:
+            spec_endpoints = (
+                self._extract_spec_endpoints(spec)
+                if spec.module_type in ['web_api', 'web_app'] else set()
+            )
+            if spec_endpoints:
                 existing_endpoints = self._extract_endpoints(existing_code, target_language)
-                spec_endpoints = self._extract_spec_endpoints(spec)
 
                 missing_endpoints = spec_endpoints - existing_endpoints
                 for endpoint in missing_endpoints:
@@ -210,7 +380,7 @@ Generate the missing code in {target_language} that integrates seamlessly with t
             chain = prompt | self.llm
 
             response = await chain.ainvoke({
-                "specification": spec.model_dump_json(indent=2),
+                "specification": spec.compact_json,
                 "existing_code": existing_code,
                 "missing_components": gap_summary,
                 "target_language": target_language
@@ -218,14 +388,12 @@ Generate the missing code in {target_language} that integrates seamlessly with t
 
             new_code = str(response.content).strip()
 
-            # Clean up the response
+            # Clean up the response: drop the opening fence line and closing fence
             if new_code.startswith('```'):
-                lines = new_code.split('\n')
-                if lines[0].startswith('```'):
-                    lines = lines[1:]
-                if lines and lines[-1] == '```':
-                    lines = lines[:-1]
-                new_code = '\n'.join(lines)
+                newline = new_code.find('\n')
+                new_code = new_code[newline + 1:] if newline != -1 else ''
+                if new_code.endswith('```'):
+                    new_code = new_code[:-3].rstrip('\n')
 
             # Integrate the new code with existing code
             integrated_code = self._integrate_code(existing_code, new_code, target_language)
@@ -238,95 +406,32 @@ Generate the missing code in {target_language} that integrates seamlessly with t
 
     def _extract_python_functions(self, code: str) -> Set[str]:
         """Extract function names from Python code."""
-        functions = set()
-        try:
-            tree = ast.parse(code)
-            for node in ast.walk(tree):
-                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    functions.add(node.name)
-        except:
-            pass
-        return functions
+        return set(_parse_python_once(code)[0])
 
     def _extract_go_functions(self, code: str) -> Set[str]:
         """Extract function names from Go code."""
-        functions = set()
         # Simple regex-based extraction for Go functions
-        func_pattern = r'func\s+(\w+)\s*\('
-        matches = re.findall(func_pattern, code)
-        functions.update(matches)
-        return functions
+        return set(_GO_FUNC_RE.findall(code))
 
     def _extract_js_functions(self, code: str) -> Set[str]:
         """Extract function names from JavaScript code."""
-        functions = set()
         # Extract function declarations and arrow functions
-        patterns = [
-            r'function\s+(\w+)\s*\(',
-            r'const\s+(\w+)\s*=\s*\(',
-            r'(\w+)\s*:\s*function\s*\('
-        ]
-        for pattern in patterns:
-            matches = re.findall(pattern, code)
-            functions.update(matches)
-        return functions
+        return _collect_groups(_JS_FUNC_RE, code)
 
     def _extract_imports(self, code: str, language: str) -> Set[str]:
         """Extract import statements from code."""
-        imports = set()
         if language == 'python':
-            import_patterns = [
-                r'import\s+(\w+)',
-                r'from\s+(\w+)\s+import'
-            ]
-        elif language == 'go':
-            import_patterns = [r'"([^"]+)"']
-        elif language == 'javascript':
-            import_patterns = [
-                r'import\s+.*from\s+["\']([^"\']+)["\']',
-                r'const\s+\w+\s*=\s*require\s*\(\s*["\']([^"\']+)["\']'
-            ]
-        else:
-            return imports
-
-        for pattern in import_patterns:
-            matches = re.findall(pattern, code)
-            imports.update(matches)
-
-        return imports
+            # Reuse the AST already built for function extraction
+            return set(_parse_python_once(code)[1])
+        if language == 'go':
+            return _extract_go_imports(code)
+        pattern = _IMPORT_RES.get(language)
+        return _collect_groups(pattern, code) if pattern else set()
 
     def _extract_endpoints(self, code: str, language: str) -> Set[str]:
         """Extract endpoint/route definitions from code."""
-        endpoints = set()
-        if language == 'python':
-            # Flask/Django style routes
-            patterns = [
-                r'@app\.route\s*\(\s*["\']([^"\']+)["\']',
-                r'path\s*\(\s*["\']([^"\']+)["\']'
-            ]
-        elif language == 'go':
-            # Gorilla mux or standard HTTP routes
-            patterns = [
-                r'HandleFunc\s*\(\s*["\']([^"\']+)["\']',
-                r'Handle\s*\(\s*["\']([^"\']+)["\']'
-            ]
-        elif language == 'javascript':
-            # Express.js routes
-            patterns = [
-                r'app\.(get|post|put|delete)\s*\(\s*["\']([^"\']+)["\']'
-            ]
-        else:
-            return endpoints
-
-        for pattern in patterns:
-            matches = re.findall(pattern, code)
-            if matches:
-                if isinstance(matches[0], tuple):
-                    endpoints.update(match[1] for match in matches)
-                else:
-                    endpoints.update(matches)
-
-        return endpoints
+        pattern = _ENDPOINT_RES.get(language)
+        return _collect_groups(pattern, code) if pattern else set()
 
     def _extract_spec_endpoints(self, spec: ModuleSpecification) -> Set[str]:
         """Extract endpoint information from specification."""
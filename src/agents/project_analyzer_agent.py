@@ -1,8 +1,14 @@
 """
 ProjectAnalyzer Agent - Determines application type, architecture, and overall structure.
 """
+import asyncio
+import io
 import json
-from typing import Dict, List, Any, Optional
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple
 from pathlib import Path
 from langchain_core.prompts import ChatPromptTemplate
 from .base_agent import BaseAgent
@@ -11,21 +17,56 @@ from ..models.hierarchical_spec import (
     FolderSpecification, FolderPurpose
 )
 from ..persistence.agent_checkpoint import CheckpointManager
+from ..persistence.response_cache import ResponseCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Directories never descended into while walking the project
+_SKIP_DIRS = frozenset({'.git', 'node_modules', '__pycache__', '.venv', 'venv', 'dist', 'build'})
+
+
+class _WalkedFile(NamedTuple):
+    """A file found during the project walk, with paths kept as plain strings."""
+    path: str
+    rel_path: str
+    name: str
+    dir_name: str
+
+
+@dataclass
+class _ProjectWalk:
+    """Result of a single traversal of the project tree, shared by all analysis steps."""
+    files: List[_WalkedFile] = field(default_factory=list)
+    root_files: List[_WalkedFile] = field(default_factory=list)
+    # (name, is_dir) listings for directories shallow enough to appear in the tree preview
+    listings: Dict[str, List[Tuple[str, bool]]] = field(default_factory=dict)
+
+
+def _read_head(path: str, size: int) -> str:
+    """Read the first bytes of a file as text; binary read + decode avoids text-mode overhead."""
+    with open(path, 'rb') as f:
+        return f.read(size).decode('utf-8', errors='ignore')
+
+
+_INDENTED_ENCODER = json.JSONEncoder(indent=2)
 
-class ProjectAnalyzerAgent(BaseAgent):
-    """Analyzes project structure to determine application type and architecture."""
-    
-    def __init__(self, checkpoint_manager: Optional[CheckpointManager] = None, **kwargs):
-        super().__init__(**kwargs)
-        self.checkpoint_manager = checkpoint_manager
-    
-    def get_prompt(self) -> ChatPromptTemplate:
-        return ChatPromptTemplate.from_messages([
-            ("system", """You are a software architecture expert analyzing a codebase to determine its type, structure, and frameworks.
+
+def _truncated_json(value: Any, limit: int) -> str:
+    """Pretty-print JSON only until `limit` characters have been produced."""
+    buffer = io.StringIO()
+    for chunk in _INDENTED_ENCODER.iterencode(value):
+        buffer.write(chunk)
+        if buffer.tell() >= limit:
+            break
+    return buffer.getvalue()[:limit]
+
+
+# Bump whenever the analysis prompt changes so cached analyses are not reused
+PROMPT_VERSION = "1"
+
+# Static system prompt shared by every analysis so providers can cache the prefix
+_SYSTEM_PROMPT = """You are a software architecture expert analyzing a codebase to determine its type, structure, and frameworks.
 
             Analyze the provided project information and return ONLY valid JSON:
 
@@ -108,9 +149,11 @@ class ProjectAnalyzerAgent(BaseAgent):
             - hexagonal: Ports and adapters pattern
 
             CRITICAL: Analyze file contents, not just names. Look for import statements, class inheritance,
-            and framework-specific patterns to determine frameworks with high confidence."""),
-            
-            ("human", """Analyze this project structure:
+            and framework-specific patterns to determine frameworks with high confidence."""
+
+_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", _SYSTEM_PROMPT),
+    ("human", """Analyze this project structure:
 
             Root Path: {root_path}
             
@@ -127,7 +170,27 @@ class ProjectAnalyzerAgent(BaseAgent):
             {file_stats}
             
             Return ONLY the JSON analysis.""")
-        ])
+])
+
+
+class ProjectAnalyzerAgent(BaseAgent):
+    """Analyzes project structure to determine application type and architecture."""
+    
+    def __init__(
+        self,
+        checkpoint_manager: Optional[CheckpointManager] = None,
+        response_cache: Optional[ResponseCache] = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.checkpoint_manager = checkpoint_manager
+        # Analyses are keyed by the gathered project facts, so unchanged projects skip the LLM
+        if response_cache is None and checkpoint_manager:
+            response_cache = ResponseCache.for_checkpoint_dir(checkpoint_manager.checkpoint_dir)
+        self.response_cache = response_cache
+    
+    def get_prompt(self) -> ChatPromptTemplate:
+        return _PROMPT
     
     async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze project to determine type and architecture."""
@@ -144,11 +207,14 @@ class ProjectAnalyzerAgent(BaseAgent):
         self.log_action(f"Analyzing project structure at: {root_path}")
         
         try:
-            # Gather project information
-            config_files = self._find_config_files(root_path)
-            directory_structure = self._get_directory_structure(root_path)
-            entry_files = self._find_entry_points(root_path)
-            file_stats = self._calculate_file_stats(root_path)
+            # Gather project information from a single directory walk
+            walk = self._walk_once(root_path)
+            config_files, entry_files = await asyncio.gather(
+                self._find_config_files(walk),
+                self._find_entry_points(walk)
+            )
+            directory_structure = self._get_directory_structure(root_path, walk)
+            file_stats = self._calculate_file_stats(walk)
             
             # Analyze with LLM
             project_analysis = await self._analyze_project(
@@ -187,7 +253,42 @@ class ProjectAnalyzerAgent(BaseAgent):
         
         return state
     
-    def _find_config_files(self, root_path: Path) -> List[Dict[str, str]]:
+    def _walk_once(self, root_path: Path, listing_depth: int = 2) -> _ProjectWalk:
+        """Walk the project once with os.scandir, pruning skipped directories."""
+        walk = _ProjectWalk()
+        root_str = str(root_path)
+        # Relative paths are sliced off this prefix instead of building Path objects
+        root_prefix = os.path.join(root_str, '')
+        stack = [(root_str, root_path.name, 0)]
+        
+        while stack:
+            dir_path, dir_name, depth = stack.pop()
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+            
+            if depth < listing_depth:
+                walk.listings[dir_path] = [(entry.name, entry.is_dir()) for entry in entries]
+            
+            subdirs = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in _SKIP_DIRS:
+                        subdirs.append(entry)
+                elif entry.is_file():
+                    file = _WalkedFile(entry.path, entry.path[len(root_prefix):], entry.name, dir_name)
+                    walk.files.append(file)
+                    if depth == 0:
+                        walk.root_files.append(file)
+            
+            # Reverse so directories are visited in name order
+            stack.extend((subdir.path, subdir.name, depth + 1) for subdir in reversed(subdirs))
+        
+        return walk
+    
+    async def _find_config_files(self, walk: _ProjectWalk) -> List[Dict[str, str]]:
         """Find configuration files that indicate project type."""
         config_patterns = [
             "package.json", "pom.xml", "build.gradle", "project.clj",
@@ -196,108 +297,112 @@ class ProjectAnalyzerAgent(BaseAgent):
             "docker-compose.yml", ".env", "config.yaml", "settings.py"
         ]
         
-        config_files = []
-        for pattern in config_patterns:
-            for file in root_path.glob(pattern):
-                if file.is_file():
-                    # Read first few lines for context
-                    try:
-                        with open(file, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read(500)  # First 500 chars
-                        config_files.append({
-                            "name": file.name,
-                            "path": str(file.relative_to(root_path)),
-                            "preview": content[:200]
-                        })
-                    except Exception:
-                        config_files.append({
-                            "name": file.name,
-                            "path": str(file.relative_to(root_path)),
-                            "preview": ""
-                        })
+        matches = [
+            file
+            for pattern in config_patterns
+            for file in walk.root_files
+            if fnmatch(file.name, pattern)
+        ]
+        
+        # Read first few lines for context, overlapping the disk reads
+        previews = await asyncio.gather(
+            *[asyncio.to_thread(_read_head, file.path, 500) for file in matches],
+            return_exceptions=True
+        )
         
-        return config_files
+        return [
+            {
+                "name": file.name,
+                "path": file.rel_path,
+                "preview": "" if isinstance(preview, Exception) else preview[:200]
+            }
+            for file, preview in zip(matches, previews)
+        ]
     
-    def _get_directory_structure(self, root_path: Path, max_depth: int = 2) -> str:
+    def _get_directory_structure(self, root_path: Path, walk: _ProjectWalk, max_depth: int = 2) -> str:
         """Get directory structure up to specified depth."""
-        def build_tree(path: Path, prefix: str = "", depth: int = 0) -> List[str]:
+        def build_tree(path: str, prefix: str = "", depth: int = 0) -> List[str]:
             if depth >= max_depth:
                 return []
             
             lines = []
-            try:
-                items = sorted(path.iterdir(), key=lambda p: (not p.is_dir(), p.name))
-                for i, item in enumerate(items[:20]):  # Limit to 20 items per level
-                    if item.name.startswith('.'):
-                        continue
-                    
-                    is_last = i == len(items) - 1
-                    current = "└── " if is_last else "├── "
-                    
-                    if item.is_dir():
-                        lines.append(f"{prefix}{current}{item.name}/")
-                        if depth < max_depth - 1:
-                            extension = "    " if is_last else "│   "
-                            lines.extend(build_tree(item, prefix + extension, depth + 1))
-                    else:
-                        lines.append(f"{prefix}{current}{item.name}")
-            except PermissionError:
-                pass
+            items = sorted(walk.listings.get(path, []), key=lambda item: (not item[1], item[0]))
+            for i, (name, is_dir) in enumerate(items[:20]):  # Limit to 20 items per level
+                if name.startswith('.'):
+                    continue
+                
+                is_last = i == len(items) - 1
+                current = "└── " if is_last else "├── "
+                
+                if is_dir:
+                    lines.append(f"{prefix}{current}{name}/")
+                    if depth < max_depth - 1:
+                        extension = "    " if is_last else "│   "
+                        lines.extend(build_tree(os.path.join(path, name), prefix + extension, depth + 1))
+                else:
+                    lines.append(f"{prefix}{current}{name}")
             
             return lines
         
-        tree_lines = build_tree(root_path)
+        tree_lines = build_tree(str(root_path))
         return "\n".join(tree_lines[:50])  # Limit total lines
     
-    def _find_entry_points(self, root_path: Path) -> List[Dict[str, str]]:
+    async def _find_entry_points(self, walk: _ProjectWalk, limit: int = 10) -> List[Dict[str, str]]:
         """Find potential entry point files."""
         entry_patterns = [
             "main.*", "index.*", "app.*", "server.*", "cli.*",
             "run.*", "start.*", "__main__.py", "cmd/*"
         ]
         
-        entry_files = []
+        candidates = []
         for pattern in entry_patterns:
-            for file in root_path.rglob(pattern):
-                if file.is_file() and not any(skip in str(file) for skip in ['node_modules', '.git', '__pycache__']):
-                    try:
-                        with open(file, 'r', encoding='utf-8', errors='ignore') as f:
-                            # Read first few lines
-                            lines = f.readlines()[:10]
-                            content = "".join(lines)
-                        
-                        entry_files.append({
-                            "name": file.name,
-                            "path": str(file.relative_to(root_path)),
-                            "preview": content[:200]
-                        })
-                    except Exception:
-                        pass
+            parent_pattern, _, name_pattern = pattern.rpartition('/')
+            candidates.extend(
+                file for file in walk.files
+                if fnmatch(file.name, name_pattern) and (
+                    not parent_pattern or fnmatch(file.dir_name, parent_pattern)
+                )
+            )
         
-        return entry_files[:10]  # Limit to 10 entries
+        # Read previews concurrently, one batch at a time until enough are readable
+        entry_files = []
+        for start in range(0, len(candidates), limit):
+            batch = candidates[start:start + limit]
+            previews = await asyncio.gather(
+                *[asyncio.to_thread(_read_head, file.path, 1000) for file in batch],
+                return_exceptions=True
+            )
+            for file, preview in zip(batch, previews):
+                if isinstance(preview, Exception):
+                    continue
+                # First few lines only
+                content = "".join(preview.splitlines(keepends=True)[:10])
+                entry_files.append({
+                    "name": file.name,
+                    "path": file.rel_path,
+                    "preview": content[:200]
+                })
+            if len(entry_files) >= limit:
+                break
+        
+        return entry_files[:limit]
     
-    def _calculate_file_stats(self, root_path: Path) -> Dict[str, Any]:
+    def _calculate_file_stats(self, walk: _ProjectWalk) -> Dict[str, Any]:
         """Calculate file statistics for the project."""
-        stats = {
-            "total_files": 0,
-            "by_extension": {},
-            "by_directory": {}
-        }
+        ext_counter = Counter()
+        dir_counter = Counter()
         
-        for file in root_path.rglob('*'):
-            if file.is_file() and not any(skip in str(file) for skip in ['node_modules', '.git', '__pycache__']):
-                stats["total_files"] += 1
-                
-                ext = file.suffix
-                stats["by_extension"][ext] = stats["by_extension"].get(ext, 0) + 1
-                
-                dir_name = file.parent.name
-                if dir_name:
-                    stats["by_directory"][dir_name] = stats["by_directory"].get(dir_name, 0) + 1
+        for file in walk.files:
+            ext_counter[os.path.splitext(file.name)[1]] += 1
+            
+            if file.dir_name:
+                dir_counter[file.dir_name] += 1
         
-        # Sort and limit
-        stats["by_extension"] = dict(sorted(stats["by_extension"].items(), key=lambda x: x[1], reverse=True)[:10])
-        stats["by_directory"] = dict(sorted(stats["by_directory"].items(), key=lambda x: x[1], reverse=True)[:10])
+        stats = {
+            "total_files": len(walk.files),
+            "by_extension": dict(ext_counter.most_common(10)),
+            "by_directory": dict(dir_counter.most_common(10))
+        }
         
         return stats
     
@@ -310,32 +415,48 @@ class ProjectAnalyzerAgent(BaseAgent):
         file_stats: Dict
     ) -> Dict[str, Any]:
         """Use LLM to analyze project structure."""
+        cache_key = ResponseCache.make_key(PROMPT_VERSION, self.model_identity, json.dumps(
+            [str(root_path), config_files, directory_structure, entry_files, file_stats],
+            sort_keys=True
+        ))
+        if self.response_cache:
+            cached = await asyncio.to_thread(self.response_cache.get, "project_analyzer", cache_key)
+            if cached is not None:
+                logger.info("Using cached project analysis")
+                return cached
+        
         prompt = self.get_prompt()
         chain = prompt | self.llm
         
         # Format inputs
-        config_str = json.dumps(config_files, indent=2)[:1000]
-        entry_str = json.dumps(entry_files, indent=2)[:1000]
+        config_str = _truncated_json(config_files, 1000)
+        entry_str = _truncated_json(entry_files, 1000)
         stats_str = json.dumps(file_stats, indent=2)
         
-        response = await chain.ainvoke({
+        # Stream the response so the network transfer overlaps generation
+        chunks = []
+        async for chunk in chain.astream({
             "root_path": str(root_path),
             "config_files": config_str,
             "directory_structure": directory_structure,
             "entry_files": entry_str,
             "file_stats": stats_str
-        })
+        }):
+            chunks.append(chunk.content)
         
         # Parse response
-        content = response.content.strip()
-        if content.startswith('```json'):
-            content = content[7:]
+        content = "".join(chunks).strip()
         if content.startswith('```'):
-            content = content[3:]
+            # Drop the whole fence line, whatever language tag it carries
+            newline = content.find('\n')
+            content = content[newline + 1:] if newline != -1 else content[3:]
         if content.endswith('```'):
             content = content[:-3]
         
-        return json.loads(content.strip())
+        analysis = json.loads(content.strip())
+        if self.response_cache:
+            await asyncio.to_thread(self.response_cache.set, "project_analyzer", cache_key, analysis)
+        return analysis
     
     def _create_project_spec(self, root_path: Path, analysis: Dict[str, Any]) -> ProjectSpecification:
         """Create project specification from analysis."""
@@ -1,27 +1,161 @@
-from typing import Dict, List, Any, Optional
-from pathlib import Path
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Mapping, Callable, Tuple
 from langchain_core.prompts import ChatPromptTemplate
-from .base_agent import BaseAgent
-from ..models.specification import ModuleSpecification, CodebaseSpecification
-import json
+from .base_agent import BaseAgent, llm_model_name
+from ..models.specification import ModuleSpecification
+from ..persistence.response_cache import ResponseCache
+from ..persistence.translation_journal import TranslationJournal
+from ..utils.serialization import dumps, loads
+from ..utils.llm_pool import LLMClientPool, PoolEndpoint
+from ..utils.architecture_guidance import normalize_dependencies
+from langchain_openai import ChatOpenAI
+from langchain_anthropic import ChatAnthropic
+from openai import AsyncOpenAI
+import ast
+import asyncio
+import bisect
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
-class TranslatorAgent(BaseAgent):
-    def __init__(self, checkpoint_manager=None, language_settings=None, **kwargs):
-        # Remove language_settings from kwargs before passing to parent
-        kwargs_copy = kwargs.copy()
-        super().__init__(**kwargs_copy)
-        self.checkpoint_manager = checkpoint_manager
-        self.language_mappings = self._load_language_mappings()
-        # Store language settings from config
-        self.language_settings = language_settings or {}
-        logger.info(f"Translator agent initialized with language settings: {list(self.language_settings.keys())}")
-        
-    def get_prompt(self) -> ChatPromptTemplate:
-        return ChatPromptTemplate.from_messages([
-            ("system", """You are an expert code translator that converts language-agnostic specifications into working code.
+# Bump whenever the translation prompt changes so cached responses are not reused
+PROMPT_VERSION = "3"
+
+# The Batch API is only offered by OpenAI itself, not by OpenAI-compatible gateways
+_OPENAI_API_BASE = "https://api.openai.com/v1"
+
+# Immutable lookup tables, allocated once per process
+_DEFAULT_LANG_REQS = "Follow language best practices and conventions"
+
+_LANG_REQS: Mapping[str, str] = MappingProxyType({
+    'python': """
+    - Use type hints for all functions
+    - Follow PEP 8 style guide
+    - Use f-strings for string formatting
+    - Prefer list comprehensions where appropriate
+    - Use context managers for file operations
+    """,
+    'javascript': """
+    - Use modern ES6+ syntax
+    - Use const/let instead of var
+    - Use arrow functions where appropriate
+    - Handle async operations with async/await
+    - Include proper error handling
+    """,
+    'typescript': """
+    - Define interfaces for all data structures
+    - Use strict typing throughout
+    - Follow TypeScript best practices
+    - Use enums for constant values
+    - Include JSDoc comments
+    """,
+    'java': """
+    - Follow Java naming conventions
+    - Use appropriate access modifiers
+    - Implement proper exception handling
+    - Use generics where applicable
+    - Follow SOLID principles
+    """,
+    'go': """
+    - Follow Go idioms and conventions
+    - Handle errors explicitly
+    - Use defer for cleanup
+    - Keep interfaces small
+    - Use goroutines for concurrency where specified
+    """,
+    'rust': """
+    - Follow Rust ownership rules
+    - Use Result<T, E> for error handling
+    - Implement traits where appropriate
+    - Use match expressions
+    - Follow Rust naming conventions
+    """,
+    'clojure': """
+    - Use idiomatic Clojure syntax with proper parentheses
+    - Use namespaces correctly with ns declarations
+    - Follow Clojure naming conventions (kebab-case for functions/variables)
+    - Use functional programming patterns
+    - Use immutability by default
+    - Use appropriate data structures (maps, vectors, lists, sets)
+    - Include proper documentation strings for functions
+    - Use defn for function definitions
+    - Use let for local bindings
+    """
+})
+
+_EXT_MAP: Mapping[str, str] = MappingProxyType({
+    'python': '.py',
+    'javascript': '.js',
+    'typescript': '.ts',
+    'java': '.java',
+    'go': '.go',
+    'rust': '.rs',
+    'cpp': '.cpp',
+    'c': '.c',
+    'clojure': '.clj'
+})
+
+_LANGUAGE_MAPPINGS: Mapping[str, Dict[str, Dict[str, str]]] = MappingProxyType({
+    'python': {
+        'javascript': {
+            'os': 'fs',
+            'sys': 'process',
+            'json': 'JSON',
+            'requests': 'axios',
+            'numpy': 'numeric',
+            'pandas': 'dataframe-js'
+        },
+        'java': {
+            'os': 'java.io.File',
+            'sys': 'java.lang.System',
+            'json': 'com.google.gson.Gson',
+            'requests': 'java.net.http.HttpClient'
+        },
+        'go': {
+            'os': 'os',
+            'sys': 'os',
+            'json': 'encoding/json',
+            'requests': 'net/http'
+        }
+    },
+    'clojure': {
+        'go': {
+            'ring.adapter.jetty': 'net/http',
+            'ring.util.response': 'net/http'
+        },
+        'javascript': {
+            'ring.adapter.jetty': 'express',
+            'ring.util.response': 'express'
+        },
+        'java': {
+            'ring.adapter.jetty': 'org.eclipse.jetty',
+            'ring.util.response': 'javax.servlet.http'
+        }
+    }
+})
+
+def _post_process_python(code: str, spec) -> str:
+    # Any existing shebang is kept as-is rather than stacking a second one above it
+    if not code.startswith('#!'):
+        code = '#!/usr/bin/env python3\n# -*- coding: utf-8 -*-\n\n' + code
+    return code
+
+
+def _post_process_clojure(code: str, spec) -> str:
+    if not code.startswith('(ns '):
+        # If no namespace declaration, add a default one
+        if spec and spec.module_name:
+            module_name = spec.module_name.replace('_', '-')
+        else:
+            module_name = 'unknown-module'
+        code = f'(ns {module_name})\n\n{code}'
+    return code
+
+
+# Static instructions come first so the prompt prefix is identical for every module
+_SYSTEM_RULES = """You are an expert code translator that converts language-agnostic specifications into working code.
             
             Given a module specification, generate idiomatic code in the target language that:
             1. Implements all specified operations in the correct order
@@ -36,21 +170,420 @@ class TranslatorAgent(BaseAgent):
             - Handle imports/dependencies correctly for the target language
             - Maintain functional equivalence - the translated code must behave identically
             
-            Return the complete, working code for the module."""),
-            ("human", """Translate this specification to {target_language}:
+            Return the complete, working code for the module."""
+
+_SYSTEM_CONTEXT = """
+
+            Language-specific requirements for {target_language}:
+            {language_requirements}
+
+            Target Framework Context:
+            {framework_context}"""
+
+_HUMAN_TEMPLATE = """Translate this specification to {target_language}:
 
             Specification:
             {specification}
 
-            Target Framework Context:
-            {framework_context}
+            Generate the complete code:"""
 
-            Language-specific requirements:
-            {language_requirements}
+def _python_requirements(settings: Dict[str, Any]) -> List[str]:
+    requirements = []
+    if settings.get('include_type_hints', False):
+        requirements.append("- Use type hints for all functions")
+    if settings.get('format_with_black', False):
+        requirements.append("- Format code with Black formatter")
+    requirements.extend([
+        "- Follow PEP 8 style guide",
+        "- Use f-strings for string formatting",
+        "- Prefer list comprehensions where appropriate",
+        "- Use context managers for file operations"
+    ])
+    return requirements
+
+
+def _javascript_requirements(settings: Dict[str, Any]) -> List[str]:
+    requirements = []
+    if settings.get('use_es6', False):
+        requirements.append("- Use modern ES6+ syntax")
+    if settings.get('include_jsdoc', False):
+        requirements.append("- Include JSDoc comments for all functions")
+    requirements.extend([
+        "- Use const/let instead of var",
+        "- Use arrow functions where appropriate",
+        "- Handle async operations with async/await",
+        "- Include proper error handling"
+    ])
+    return requirements
+
+
+def _typescript_requirements(settings: Dict[str, Any]) -> List[str]:
+    requirements = []
+    if settings.get('strict_mode', False):
+        requirements.append("- Use strict typing throughout")
+    if settings.get('include_interfaces', False):
+        requirements.append("- Define interfaces for all data structures")
+    requirements.extend([
+        "- Follow TypeScript best practices",
+        "- Use enums for constant values",
+        "- Include JSDoc comments"
+    ])
+    return requirements
+
+
+def _java_requirements(settings: Dict[str, Any]) -> List[str]:
+    requirements = []
+    if settings.get('package_structure', False):
+        requirements.append("- Use proper package structure")
+    if settings.get('include_javadoc', False):
+        requirements.append("- Include Javadoc comments for all public methods")
+    requirements.extend([
+        "- Follow Java naming conventions",
+        "- Use appropriate access modifiers",
+        "- Implement proper exception handling",
+        "- Use generics where applicable",
+        "- Follow SOLID principles"
+    ])
+    return requirements
+
+
+def _go_requirements(settings: Dict[str, Any]) -> List[str]:
+    requirements = []
+    if settings.get('format_with_gofmt', False):
+        requirements.append("- Format code with gofmt")
+    if settings.get('include_godoc', False):
+        requirements.append("- Include Godoc comments for all exported functions")
+    requirements.extend([
+        "- Follow Go idioms and conventions",
+        "- Handle errors explicitly",
+        "- Use defer for cleanup",
+        "- Keep interfaces small",
+        "- Use goroutines for concurrency where specified"
+    ])
+    return requirements
+
+
+def _default_requirements(settings: Dict[str, Any]) -> List[str]:
+    # For other languages, use default requirements
+    return [
+        "- Follow language best practices and conventions",
+        "- Use appropriate idioms for the target language",
+        "- Maintain functional equivalence with the source specification"
+    ]
+
+
+# Requirement builders for languages configured in language_settings, keyed by language
+_SETTINGS_REQUIREMENTS = {
+    'python': _python_requirements,
+    'javascript': _javascript_requirements,
+    'typescript': _typescript_requirements,
+    'java': _java_requirements,
+    'go': _go_requirements,
+}
+
+# Language-specific fix-ups applied after fence stripping; other languages pass through unchanged
+_LANGUAGE_POST_PROCESSORS = {
+    'python': _post_process_python,
+    'clojure': _post_process_clojure,
+}
+
+def _iter_python_imports(dependencies):
+    for dep in dependencies:
+        if dep.import_type == 'standard':
+            yield f"import {dep.module}"
+        elif dep.import_type == 'from_import':
+            package, _, name = dep.module.rpartition('.')
+            if package:
+                yield f"from {package} import {name}"
+
+
+def _python_imports(spec, dependencies) -> str:
+    # dict.fromkeys de-duplicates both import kinds while keeping source order
+    return '\n'.join(dict.fromkeys(_iter_python_imports(dependencies)))
+
+
+def _clojure_imports(spec, dependencies) -> str:
+    # Add Clojure namespace declaration
+    if spec and spec.file_path:
+        module_name = os.path.splitext(os.path.basename(spec.file_path))[0].replace('_', '-')
+    else:
+        module_name = 'unknown-module'
+    return f'(ns {module_name})'
+
+
+# Header lines that do not depend on the module; specific mappings are skipped for now
+_JAVA_IMPORTS = "import java.util.*;\nimport java.io.*;"
+_GO_IMPORTS = 'package main\nimport (\n    "fmt"\n    "net/http"\n)'
+
+# Import block generators keyed by target language; each takes (spec, dependencies)
+_IMPORT_GENERATORS = {
+    'python': _python_imports,
+    # Generic JS/TS imports without language mapping
+    'javascript': lambda spec, deps: '\n'.join(f"const {{{dep.module}}} = require('{dep.module}');" for dep in deps),
+    'typescript': lambda spec, deps: '\n'.join(f"import {{{dep.module}}} from '{dep.module}';" for dep in deps),
+    'java': lambda spec, deps: _JAVA_IMPORTS,
+    'go': lambda spec, deps: _GO_IMPORTS,
+    'clojure': _clojure_imports,
+}
+
+# Optional ModuleSpecification attributes copied into the architectural context when set
+_SPEC_CONTEXT_FIELDS = (
+    "architectural_context",
+    "deployment_pattern",
+    "scaling_characteristics",
+    "failure_tolerance",
+    "infrastructure_assumptions",
+    "domain_context",
+)
+
+# Upper edges (estimated output tokens) of the length bins used by the batcher
+_BATCH_BIN_EDGES = (1_000, 4_000, 16_000)
+# Rough extra output tokens per specified operation when estimating translation length
+_TOKENS_PER_OPERATION = 50
+
+# Raw outputs larger than this are post-processed off the event loop thread
+_OFFLOAD_POST_PROCESS_CHARS = 100_000
+
+# Most recently used finished translations kept in memory; older ones fall back to the response cache
+_TRANSLATED_CODE_CACHE_SIZE = 256
+
+_BRACKET_PAIRS = {')': '(', ']': '[', '}': '{'}
+# Lisps use ; comments, \( character literals, and ' as quote syntax rather than a string delimiter
+_LISP_LANGUAGES = frozenset({'clojure'})
+# ' also starts lifetimes ('a), so only 'x' and escapes like '\n' are character literals
+_LIFETIME_LANGUAGES = frozenset({'rust'})
+_REGEX_LITERAL_LANGUAGES = frozenset({'javascript', 'typescript'})
+# A / after one of these (or at the start) begins a regex literal rather than a division
+_REGEX_PRECEDERS = frozenset('(,=:[!&|?{};') | {''}
+
+
+def _literal_end(code: str, start: int) -> int:
+    """Index of the delimiter closing the literal opened at start, or -1 if it is not closed.
+
+    Only backtick literals (template/raw strings) may span lines.
+    """
+    delimiter = code[start]
+    i = start + 1
+    while i < len(code):
+        char = code[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == delimiter:
+            return i
+        if char == '\n' and delimiter != '`':
+            return -1
+        i += 1
+    return -1
+
+
+def _brackets_balanced(code: str, language: str = '') -> bool:
+    """Cheap structural check for brace and paren languages.
 
-            Generate the complete code:""")
+    Brackets inside string, character and regex literals and comments are ignored, and
+    output cut off inside a string or block comment fails the check.
+    """
+    lisp = language in _LISP_LANGUAGES
+    line_comment = ';' if lisp else '//'
+    quotes = '"' if lisp else '"\'`'
+    stack = []
+    previous = ''
+    i = 0
+    while i < len(code):
+        char = code[i]
+        if code.startswith(line_comment, i):
+            i = code.find('\n', i)
+            if i < 0:
+                break
+            continue
+        if not lisp and code.startswith('/*', i):
+            end = code.find('*/', i + 2)
+            if end < 0:
+                return False
+            i = end + 2
+            continue
+        if lisp and char == '\\':
+            i += 2
+            previous = char
+            continue
+        if char in quotes:
+            end = _literal_end(code, i)
+            lifetime = language in _LIFETIME_LANGUAGES and end - i != 2 and code[i + 1:i + 2] != '\\'
+            if char == "'" and (end < 0 or lifetime):
+                # A lifetime or stray apostrophe, not a literal
+                end = i
+            elif end < 0:
+                return False
+            i = end + 1
+            previous = char
+            continue
+        if char == '/' and language in _REGEX_LITERAL_LANGUAGES and previous in _REGEX_PRECEDERS:
+            end = _literal_end(code, i)
+            if end >= 0:
+                i = end + 1
+                previous = char
+                continue
+        if char in '([{':
+            stack.append(char)
+        elif char in _BRACKET_PAIRS:
+            if not stack or stack.pop() != _BRACKET_PAIRS[char]:
+                return False
+        if not char.isspace():
+            previous = char
+        i += 1
+    return not stack
+
+
+class TranslatorAgent(BaseAgent):
+    language_mappings = _LANGUAGE_MAPPINGS
+
+    def __init__(
+        self,
+        checkpoint_manager=None,
+        language_settings=None,
+        response_cache=None,
+        llm_endpoints: Optional[List[Dict[str, Any]]] = None,
+        on_token: Optional[Callable[[str, str], None]] = None,
+        llm_tiers: Optional[List[Dict[str, Any]]] = None,
+        draft_llm: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1,
+        max_concurrent_batches: int = 4,
+        batch_wait_seconds: float = 0.05,
+        **kwargs
+    ):
+        # Remove language_settings from kwargs before passing to parent
+        kwargs_copy = kwargs.copy()
+        super().__init__(**kwargs_copy)
+        self.checkpoint_manager = checkpoint_manager
+        # Raw LLM output keyed by everything that goes into the prompt, shared across runs
+        if response_cache is None and checkpoint_manager:
+            response_cache = ResponseCache.for_checkpoint_dir(checkpoint_manager.checkpoint_dir)
+        self.response_cache = response_cache
+        # Completed modules are appended to a per-workflow journal so a restart can skip them
+        self.journal = (
+            TranslationJournal(checkpoint_manager.base_dir / "translated_modules.jsonl")
+            if checkpoint_manager else None
+        )
+        # Prompt template and chain are built once and reused for every module
+        self._prompt = self._build_prompt()
+        self._anthropic_prompt = self._build_prompt(cache_control=True)
+        self._chain = self._chain_for(self.llm)
+        # Optional fan-out across several backends, e.g. multiple vLLM workers
+        self._pool = self._build_pool(llm_endpoints, kwargs.get('temperature', 0.0)) if llm_endpoints else None
+        # Cheaper models tried in order before the main model; output must pass _validate_code to be kept
+        self._tiers = [
+            (tier.get('model_name') or tier.get('model'),
+             self._chain_for(self._create_endpoint_llm(tier, kwargs.get('temperature', 0.0))))
+            for tier in llm_tiers or []
+        ]
+        # Fast model raced against the main model; its output wins if it finishes first and validates
+        self._draft_chain = (
+            self._chain_for(self._create_endpoint_llm(draft_llm, kwargs.get('temperature', 0.0)))
+            if draft_llm else None
+        )
+        self._draft_name = (draft_llm.get('model_name') or draft_llm.get('model')) if draft_llm else None
+        # The main model (or pool) is part of the cache key; cheaper tier/draft output is cached under
+        # it too, tagged with its producer, and only reused while that producer is still configured
+        self._main_model = (
+            "pool:" + ",".join(
+                f"{endpoint.get('model_name') or endpoint.get('model')}@{endpoint.get('base_url', '')}"
+                for endpoint in llm_endpoints
+            )
+            if llm_endpoints else self.model_identity
+        )
+        self._cache_producers = frozenset(
+            [self._main_model, self.model_identity, self._draft_name, *(name for name, _ in self._tiers)]
+        ) - {None}
+        # Called as on_token(file_path, text) for each streamed chunk, e.g. to feed an editor or UI
+        self.on_token = on_token
+        # Identical concurrent requests share one LLM call, keyed like the response cache
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Final post-processed code for recently translated prompts, in least recently used order
+        self._translated_code: 'OrderedDict[str, str]' = OrderedDict()
+        # With batch_size > 1, main-model calls are queued and sent through chain.abatch
+        self.batch_size = batch_size
+        self.max_concurrent_batches = max_concurrent_batches
+        self.batch_wait_seconds = batch_wait_seconds
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_semaphore: Optional[asyncio.Semaphore] = None
+        self._batcher_task: Optional[asyncio.Task] = None
+        self._batch_tasks: set = set()
+        max_concurrent_requests = self.rate_limit_config.get('max_concurrent_requests', 32)
+        if batch_size > 1 and batch_size * max_concurrent_batches < max_concurrent_requests:
+            logger.warning(
+                f"batch_size {batch_size} x max_concurrent_batches {max_concurrent_batches} is below "
+                f"max_concurrent_requests {max_concurrent_requests}; batching will not saturate the backend"
+            )
+        # Store language settings from config
+        self.language_settings = language_settings or {}
+        # Settings are fixed after init, so each configured language's requirements are rendered once
+        self._language_requirements = {
+            language: self._build_language_requirements(language) for language in self.language_settings
+        }
+        logger.info(f"Translator agent initialized with language settings: {list(self.language_settings.keys())}")
+        
+    def get_prompt(self) -> ChatPromptTemplate:
+        return self._prompt
+    
+    def create_chain(self):
+        # Reuse the chain composed in __init__ instead of re-piping prompt | llm per call
+        return self._chain
+    
+    def _build_pool(self, llm_endpoints: List[Dict[str, Any]], temperature: float) -> LLMClientPool:
+        """Create one chain per configured endpoint.
+
+        Each endpoint takes ``model_name`` and optionally ``base_url`` (any OpenAI-compatible
+        server), ``api_key_env``, ``temperature`` and ``concurrency_limit``.
+        """
+        endpoints = [
+            PoolEndpoint(
+                name=f"{i}:{endpoint.get('base_url') or endpoint.get('model_name') or endpoint.get('model')}",
+                runnable=self._chain_for(self._create_endpoint_llm(endpoint, temperature)),
+                concurrency_limit=endpoint.get('concurrency_limit', 8)
+            )
+            for i, endpoint in enumerate(llm_endpoints)
+        ]
+        
+        logger.info(f"Translator using {len(endpoints)} LLM endpoints")
+        return LLMClientPool(endpoints)
+    
+    def _create_endpoint_llm(self, endpoint: Dict[str, Any], temperature: float):
+        """Build the chat model for an endpoint or tier entry."""
+        model_name = endpoint.get('model_name') or endpoint.get('model')
+        endpoint_temperature = endpoint.get('temperature', temperature)
+        if endpoint.get('base_url'):
+            return ChatOpenAI(
+                model=model_name,
+                temperature=endpoint_temperature,
+                openai_api_base=endpoint['base_url'],
+                openai_api_key=os.getenv(endpoint.get('api_key_env', 'OPENAI_API_KEY'), 'EMPTY')
+            )
+        return self._create_llm(model_name, endpoint_temperature)
+    
+    def _build_prompt(self, cache_control: bool = False) -> ChatPromptTemplate:
+        if cache_control:
+            # Anthropic caches the prefix up to the marked block: static rules plus this run's
+            # language requirements and framework context
+            system = [
+                {"type": "text", "text": _SYSTEM_RULES},
+                {"type": "text", "text": _SYSTEM_CONTEXT.lstrip('\n'), "cache_control": {"type": "ephemeral"}},
+            ]
+        else:
+            system = _SYSTEM_RULES + _SYSTEM_CONTEXT
+        return ChatPromptTemplate.from_messages([
+            ("system", system),
+            # Only the specification varies per module; everything above is a stable,
+            # provider-cacheable prefix for the whole run
+            ("human", _HUMAN_TEMPLATE)
         ])
     
+    def _prompt_for(self, llm) -> ChatPromptTemplate:
+        """Prompt variant for a model: Anthropic models get an explicit cache breakpoint."""
+        return self._anthropic_prompt if isinstance(llm, ChatAnthropic) else self._prompt
+    
+    def _chain_for(self, llm):
+        return self._prompt_for(llm) | llm
+    
     async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         # Defensive check for None state
         if state is None:
@@ -60,11 +593,7 @@ class TranslatorAgent(BaseAgent):
         current_spec = state.get('current_module')
         target_language = state.get('target_language')
 
-        # Initialize required state fields if missing
-        if 'errors' not in state:
-            state['errors'] = []
-        if 'messages' not in state:
-            state['messages'] = []
+        self._prepare_state(state)
 
         if not current_spec:
             state['errors'].append({"type": "missing_spec", "message": "No specification to translate"})
@@ -75,45 +604,261 @@ class TranslatorAgent(BaseAgent):
             return state
         
         self.log_action(f"Translating {current_spec.module_name} to {target_language}")
+        # Only the batch entry points replay the journal, so single-module calls skip writing it
+        await self._translate_into_state(state, current_spec, target_language, journal=False)
         
-        try:
-            translated_code = await self._translate_module(current_spec, target_language, state)
-            
-            if not current_spec.file_path:
-                raise ValueError(f"Invalid file path for {current_spec.module_name}")
+        return state
+    
+    async def process_batch(
+        self,
+        state: Dict[str, Any],
+        module_specs: Optional[List[ModuleSpecification]] = None
+    ) -> Dict[str, Any]:
+        """Translate many modules concurrently into a single state, isolating per-module failures."""
+        if state is None:
+            logger.error("State is None in translator process_batch")
+            return {}
+        
+        if module_specs is None:
+            module_specs = state.get('module_specifications', [])
+        target_language = state.get('target_language')
+        
+        self._prepare_state(state)
+        
+        if not target_language:
+            state['errors'].append({"type": "missing_target_language", "message": "No target language specified"})
+            return state
+        
+        if self.journal:
+            module_specs = await self._replay_journal(state, module_specs, target_language)
+        
+        max_inflight = self.rate_limit_config.get('max_concurrent_requests', 32)
+        semaphore = asyncio.Semaphore(max_inflight)
+        
+        async def translate_one(spec: ModuleSpecification):
+            async with semaphore:
+                self.log_action(f"Translating {spec.module_name} to {target_language}")
+                await self._translate_into_state(state, spec, target_language)
+        
+        self.log_action(f"Translating {len(module_specs)} modules with up to {max_inflight} in flight")
+        await asyncio.gather(*[translate_one(spec) for spec in module_specs], return_exceptions=True)
+        if self.journal:
+            await self.journal.flush()
+        
+        return state
+    
+    async def translate_all_batch(
+        self,
+        state: Dict[str, Any],
+        module_specs: Optional[List[ModuleSpecification]] = None,
+        poll_seconds: float = 30.0
+    ) -> Dict[str, Any]:
+        """Translate modules through the OpenAI Batch API: cheaper, but results can take up to 24h.
 
-            output_path = self._generate_output_path(
-                current_spec.file_path,
-                target_language,
-                state.get('output_path', 'translated')
+        Requires the translator's LLM to be an OpenAI ChatOpenAI model; its key and model
+        name are used for the batch. Cached and journaled modules are resolved locally
+        and never submitted.
+        """
+        if state is None:
+            logger.error("State is None in translator translate_all_batch")
+            return {}
+        
+        if module_specs is None:
+            module_specs = state.get('module_specifications', [])
+        target_language = state.get('target_language')
+        
+        self._prepare_state(state)
+        
+        if not target_language:
+            state['errors'].append({"type": "missing_target_language", "message": "No target language specified"})
+            return state
+        
+        # Fail before any uploads if the configured model cannot be served by the Batch API
+        client = self._batch_client()
+        
+        if self.journal:
+            module_specs = await self._replay_journal(state, module_specs, target_language)
+        
+        # Resolve cache hits locally and build one request line per remaining module
+        pending: Dict[str, Tuple[ModuleSpecification, str]] = {}
+        lines = []
+        for i, spec in enumerate(module_specs):
+            try:
+                cache_key, inputs = self._prompt_inputs(spec, target_language, state)
+                cached = await self._cached_code(cache_key)
+                if cached:
+                    code = await self._finalize_code_async(cached, spec, target_language, state)
+                    await self._record_translation(state, spec, target_language, code)
+                    continue
+            except Exception as e:
+                state['errors'].append({"type": "translation_error", "module": spec.module_name, "message": str(e)})
+                continue
+            
+            custom_id = str(i)
+            pending[custom_id] = (spec, cache_key)
+            messages = [
+                {"role": "system" if m.type == "system" else "user", "content": m.content}
+                for m in self._prompt.format_messages(**inputs)
+            ]
+            lines.append(dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": getattr(self.llm, 'model_name', None),
+                    "temperature": getattr(self.llm, 'temperature', 0.0),
+                    "messages": messages
+                }
+            }))
+        
+        if pending:
+            self.log_action(f"Submitting {len(pending)} modules to the OpenAI Batch API")
+            batch_file = await client.files.create(
+                file=("translations.jsonl", ('\n'.join(lines) + '\n').encode('utf-8')),
+                purpose="batch"
+            )
+            batch = await client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
             )
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                await asyncio.sleep(poll_seconds)
+                batch = await client.batches.retrieve(batch.id)
+            self.log_action(f"Batch {batch.id} finished with status {batch.status}")
             
-            # Initialize translation_state if not present
-            if 'translation_state' not in state or state['translation_state'] is None:
-                state['translation_state'] = {'translated_modules': {}, 'errors': []}
-            elif not isinstance(state['translation_state'], dict):
-                state['translation_state'] = {'translated_modules': {}, 'errors': []}
-            elif 'translated_modules' not in state['translation_state']:
-                state['translation_state']['translated_modules'] = {}
-                
-            state['translation_state']['translated_modules'][current_spec.file_path] = {
-                'code': translated_code,
-                'output_path': output_path
-            }
+            results: Dict[str, str] = {}
+            if batch.output_file_id:
+                output = await client.files.content(batch.output_file_id)
+                for line in output.text.splitlines():
+                    if not line.strip():
+                        continue
+                    row = loads(line)
+                    body = (row.get('response') or {}).get('body') or {}
+                    choices = body.get('choices') or []
+                    if choices and choices[0]['message'].get('content'):
+                        results[row['custom_id']] = choices[0]['message']['content']
             
-            state['messages'].append(f"Translated {current_spec.module_name} to {target_language}")
+            for custom_id, (spec, cache_key) in pending.items():
+                raw = results.get(custom_id)
+                if not raw:
+                    state['errors'].append({
+                        "type": "translation_error",
+                        "module": spec.module_name,
+                        "message": f"No batch result for {spec.module_name} (batch status: {batch.status})"
+                    })
+                    continue
+                try:
+                    await self._cache_code(cache_key, raw, self.model_identity)
+                    code = await self._finalize_code_async(raw, spec, target_language, state)
+                    await self._record_translation(state, spec, target_language, code)
+                except Exception as e:
+                    state['errors'].append({"type": "translation_error", "module": spec.module_name, "message": str(e)})
+        
+        if self.journal:
+            await self.journal.flush()
+        
+        return state
+    
+    def _batch_client(self) -> AsyncOpenAI:
+        """Build a Batch API client from the translator's LLM settings."""
+        base_url = getattr(self.llm, 'openai_api_base', None)
+        if not isinstance(self.llm, ChatOpenAI) or base_url not in (None, _OPENAI_API_BASE):
+            model = getattr(self.llm, 'model_name', None) or getattr(self.llm, 'model', None)
+            raise ValueError(
+                f"Batch mode requires an OpenAI model served from {_OPENAI_API_BASE}; "
+                f"the translator is configured with {model} ({type(self.llm).__name__}, base URL {base_url})"
+            )
+        api_key = self.llm.openai_api_key
+        return AsyncOpenAI(
+            api_key=api_key.get_secret_value() if api_key else None,
+            base_url=base_url
+        )
+    
+    async def _replay_journal(
+        self,
+        state: Dict[str, Any],
+        module_specs: List[ModuleSpecification],
+        target_language: str
+    ) -> List[ModuleSpecification]:
+        """Restore modules translated by an earlier run and return the ones still pending."""
+        rows = await asyncio.to_thread(self.journal.load)
+        translation_state = state['translation_state']
+        pending = []
+        for spec in module_specs:
+            row = rows.get(spec.file_path)
+            if row and row.get('target_language') == target_language:
+                translation_state['codes'][spec.file_path] = row['code']
+                translation_state['output_paths'][spec.file_path] = row['output_path']
+            else:
+                pending.append(spec)
+        
+        if len(pending) < len(module_specs):
+            self.log_action(f"Resumed {len(module_specs) - len(pending)} modules from translation journal")
+        return pending
+    
+    def _prepare_state(self, state: Dict[str, Any]) -> None:
+        """Create the state fields translation writes to, once per call rather than per module."""
+        state.setdefault('errors', [])
+        state.setdefault('messages', [])
+        translation_state = state.get('translation_state')
+        if not isinstance(translation_state, dict):
+            translation_state = state['translation_state'] = {'codes': {}, 'output_paths': {}, 'errors': []}
+        translation_state.setdefault('codes', {})
+        translation_state.setdefault('output_paths', {})
+    
+    async def _translate_into_state(
+        self,
+        state: Dict[str, Any],
+        current_spec: ModuleSpecification,
+        target_language: str,
+        journal: bool = True
+    ):
+        """Translate one module and record the result or error in the state."""
+        try:
+            translated_code = await self._translate_module(current_spec, target_language, state)
+            await self._record_translation(state, current_spec, target_language, translated_code, journal)
             
         except Exception as e:
-            import traceback
             logger.error(f"Translation error for {current_spec.module_name}: {e}")
-            logger.error(f"Full traceback: {traceback.format_exc()}")
+            # exc_info defers stack formatting to the handler, so it costs nothing unless DEBUG is on
+            logger.debug("Full traceback for %s", current_spec.module_name, exc_info=True)
             state['errors'].append({
                 "type": "translation_error",
                 "module": current_spec.module_name,
                 "message": str(e)
             })
+    
+    async def _record_translation(
+        self,
+        state: Dict[str, Any],
+        current_spec: ModuleSpecification,
+        target_language: str,
+        translated_code: str,
+        journal: bool = True
+    ):
+        """Store a finished translation in the state and, unless disabled, the journal."""
+        if not current_spec.file_path:
+            raise ValueError(f"Invalid file path for {current_spec.module_name}")
+
+        output_path = self._generate_output_path(
+            current_spec.file_path,
+            target_language,
+            state.get('output_path', 'translated')
+        )
         
-        return state
+        translation_state = state['translation_state']
+        translation_state['codes'][current_spec.file_path] = translated_code
+        translation_state['output_paths'][current_spec.file_path] = output_path
+        if journal and self.journal:
+            await self.journal.record({
+                'file_path': current_spec.file_path,
+                'target_language': target_language,
+                'code': translated_code,
+                'output_path': output_path
+            })
+        
+        state['messages'].append(f"Translated {current_spec.module_name} to {target_language}")
     
     async def _translate_module(
         self, 
@@ -122,6 +867,39 @@ class TranslatorAgent(BaseAgent):
         state: Dict[str, Any]
     ) -> str:
         
+        if 'compact_json' not in spec.__dict__:
+            # First serialization of a large spec is the costliest step before the LLM call
+            await asyncio.to_thread(getattr, spec, 'compact_json')
+        cache_key, inputs = self._prompt_inputs(spec, target_language, state)
+        code = self._translated_code.get(cache_key)
+        if code is not None:
+            self._translated_code.move_to_end(cache_key)
+            return code
+
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate_code(spec, cache_key, inputs))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        else:
+            logger.info(f"Joining in-flight translation for {spec.module_name}")
+        # Shielded so one caller being cancelled does not cancel the others sharing the call
+        code = await asyncio.shield(task)
+
+        code = await self._finalize_code_async(code, spec, target_language, state)
+        self._translated_code[cache_key] = code
+        self._translated_code.move_to_end(cache_key)
+        if len(self._translated_code) > _TRANSLATED_CODE_CACHE_SIZE:
+            self._translated_code.popitem(last=False)
+        return code
+    
+    def _prompt_inputs(
+        self,
+        spec: ModuleSpecification,
+        target_language: str,
+        state: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Return the response-cache key and prompt variables for a module."""
         language_requirements = self._get_language_requirements(target_language)
         framework_context = self._get_framework_context(state)
 
@@ -130,35 +908,29 @@ class TranslatorAgent(BaseAgent):
             raise ValueError(f"Invalid specification for {spec.module_name if spec else 'unknown module'}")
 
         try:
-            spec_json = spec.model_dump_json(indent=2)
+            spec_json = spec.compact_json
         except Exception as e:
             raise ValueError(f"Failed to serialize specification for {spec.module_name}: {e}")
 
-        prompt = self.get_prompt()
-        if not prompt:
-            raise ValueError(f"Failed to get prompt for {spec.module_name}")
-
-        chain = prompt | self.llm
-        if not chain:
-            raise ValueError(f"Failed to create LLM chain for {spec.module_name}")
-
-        response = await chain.ainvoke({
+        cache_key = ResponseCache.make_key(
+            PROMPT_VERSION, self._main_model, target_language, language_requirements, framework_context, spec_json
+        )
+        inputs = {
             "target_language": target_language,
             "specification": spec_json,
             "framework_context": framework_context,
             "language_requirements": language_requirements
-        })
-
-        # Check if response is valid
-        if not response or not hasattr(response, 'content'):
-            raise ValueError(f"Invalid LLM response for {spec.module_name}")
-
-        code = response.content
-
-        # Check if response.content is None or empty
-        if not code:
-            raise ValueError(f"LLM returned empty response for {spec.module_name}")
-
+        }
+        return cache_key, inputs
+    
+    def _finalize_code(
+        self,
+        code: str,
+        spec: ModuleSpecification,
+        target_language: str,
+        state: Dict[str, Any]
+    ) -> str:
+        """Clean raw LLM output and prepend the generated imports."""
         code = self._post_process_code(code, target_language, spec)
         
         imports = self._generate_imports(spec, target_language, state)
@@ -167,142 +939,212 @@ class TranslatorAgent(BaseAgent):
         
         return code
     
+    async def _finalize_code_async(
+        self,
+        code: str,
+        spec: ModuleSpecification,
+        target_language: str,
+        state: Dict[str, Any]
+    ) -> str:
+        """_finalize_code, run in a worker thread for large outputs so the event loop stays responsive."""
+        if len(code) > _OFFLOAD_POST_PROCESS_CHARS:
+            return await asyncio.to_thread(self._finalize_code, code, spec, target_language, state)
+        return self._finalize_code(code, spec, target_language, state)
+    
+    async def _generate_code(self, spec: ModuleSpecification, cache_key: str, inputs: Dict[str, Any]) -> str:
+        """Return the raw LLM output for a prompt, from the response cache when possible."""
+        code = await self._cached_code(cache_key)
+        if code:
+            logger.info(f"Using cached translation for {spec.module_name}")
+            return code
+
+        target_language = inputs["target_language"]
+        producer = self._main_model
+        for tier_name, tier_chain in self._tiers:
+            try:
+                code = await self._stream_chain(tier_chain, spec, inputs)
+            except Exception as e:
+                logger.warning(f"Tier {tier_name} failed for {spec.module_name}: {e}")
+                continue
+            if code and self._validate_code(self._post_process_code(code, target_language, spec), target_language):
+                logger.info(f"Translated {spec.module_name} with tier {tier_name}")
+                producer = tier_name
+                break
+            logger.info(f"Tier {tier_name} output for {spec.module_name} failed validation, escalating")
+        else:
+            if self._draft_chain:
+                code, producer = await self._race_draft(spec, inputs)
+            else:
+                code = await self._primary_code(spec, inputs)
+
+        # Check if response.content is None or empty
+        if not code:
+            raise ValueError(f"LLM returned empty response for {spec.module_name}")
+
+        await self._cache_code(cache_key, code, producer)
+        return code
+
+    async def _cached_code(self, cache_key: str) -> Optional[str]:
+        """Return cached raw output, unless the model that produced it is no longer configured."""
+        if not self.response_cache:
+            return None
+        entry = await asyncio.to_thread(self.response_cache.get, "translator", cache_key)
+        if not entry or entry.get('model') not in self._cache_producers:
+            return None
+        return entry['code']
+
+    async def _cache_code(self, cache_key: str, code: str, producer: str) -> None:
+        if self.response_cache:
+            await asyncio.to_thread(
+                self.response_cache.set, "translator", cache_key, {"code": code, "model": producer}
+            )
+
+    async def _primary_code(self, spec: ModuleSpecification, inputs: Dict[str, Any]) -> str:
+        """Run the main model, through the endpoint pool or the batcher when configured."""
+        if self._pool:
+            response = await self._pool.submit(inputs)
+        elif self.batch_size > 1:
+            response = await self._submit_to_batcher(spec, inputs)
+        else:
+            return await self._stream_chain(self._chain, spec, inputs)
+
+        # Check if response is valid
+        if not response or not hasattr(response, 'content'):
+            raise ValueError(f"Invalid LLM response for {spec.module_name}")
+
+        return response.content
+
+    async def _submit_to_batcher(self, spec: ModuleSpecification, inputs: Dict[str, Any]) -> Any:
+        """Queue one request for the background batcher and wait for its response."""
+        if self._batcher_task is None or self._batcher_task.done():
+            if not self._batch_tasks:
+                self._batch_queue = asyncio.Queue()
+                self._batch_semaphore = asyncio.Semaphore(self.max_concurrent_batches)
+            self._batcher_task = asyncio.create_task(self._run_batcher())
+        # Bin by estimated output length so one huge module does not hold up a batch of small ones
+        estimated_tokens = len(inputs["specification"]) // 4 + _TOKENS_PER_OPERATION * len(spec.operations)
+        length_bin = bisect.bisect_left(_BATCH_BIN_EDGES, estimated_tokens)
+        future = asyncio.get_running_loop().create_future()
+        self._batch_queue.put_nowait((length_bin, inputs, future))
+        return await future
+
+    async def _run_batcher(self):
+        """Group queued requests into per-length-bin batches of up to batch_size; exits once the queue is empty."""
+        loop = asyncio.get_running_loop()
+        while not self._batch_queue.empty():
+            bins: Dict[int, List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+            deadline = loop.time() + self.batch_wait_seconds
+            while True:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    length_bin, inputs, future = await asyncio.wait_for(self._batch_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch = bins.setdefault(length_bin, [])
+                batch.append((inputs, future))
+                if len(batch) >= self.batch_size:
+                    await self._dispatch_batch(bins.pop(length_bin))
+
+            # Flush partially filled bins once the wait window closes
+            for batch in bins.values():
+                await self._dispatch_batch(batch)
+
+    async def _dispatch_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        await self._batch_semaphore.acquire()
+        task = asyncio.create_task(self._run_llm_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_llm_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        try:
+            results = await self._chain.abatch(
+                [inputs for inputs, _ in batch],
+                config={"max_concurrency": len(batch)},
+                return_exceptions=True
+            )
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._batch_semaphore.release()
+
+    async def _race_draft(self, spec: ModuleSpecification, inputs: Dict[str, Any]) -> Tuple[str, str]:
+        """Run the draft and main models together and keep the draft if it wins and validates.
+
+        Returns the code and the name of the model that produced it.
+        """
+        target_language = inputs["target_language"]
+        draft = asyncio.ensure_future(self._draft_chain.ainvoke(inputs))
+        primary = asyncio.ensure_future(self._primary_code(spec, inputs))
+        try:
+            done, _ = await asyncio.wait({draft, primary}, return_when=asyncio.FIRST_COMPLETED)
+            if primary in done and primary.exception() is None:
+                return primary.result(), self._main_model
+            # The draft won, or the primary failed; in the latter case the draft is the only chance left
+            if draft not in done:
+                await asyncio.wait({draft})
+            if draft.exception():
+                logger.warning(f"Draft model failed for {spec.module_name}: {draft.exception()}")
+            else:
+                draft_code = draft.result().content
+                if draft_code and self._validate_code(
+                    self._post_process_code(draft_code, target_language, spec), target_language
+                ):
+                    logger.info(f"Accepted draft translation for {spec.module_name}")
+                    return draft_code, self._draft_name
+            return await primary, self._main_model
+        finally:
+            # Whichever result was not used is abandoned; exceptions of finished tasks are
+            # retrieved so asyncio does not report them as never retrieved
+            for task in (draft, primary):
+                if task.done():
+                    if not task.cancelled():
+                        task.exception()
+                else:
+                    task.cancel()
+
+    async def _stream_chain(self, chain, spec: ModuleSpecification, inputs: Dict[str, Any]) -> str:
+        """Stream a completion so on_token consumers see output from the first token rather than the last."""
+        parts = []
+        async for chunk in chain.astream(inputs):
+            if chunk.content:
+                parts.append(chunk.content)
+                if self.on_token:
+                    self.on_token(spec.file_path, chunk.content)
+        return ''.join(parts)
+
+    def _validate_code(self, code: str, language: str) -> bool:
+        """Cheap syntax check used to decide whether a cheaper tier's output is acceptable."""
+        if language == 'python':
+            try:
+                ast.parse(code)
+            except SyntaxError:
+                return False
+            return True
+        return _brackets_balanced(code, language)
+
     def _get_language_requirements(self, language: str) -> str:
         """Get language-specific requirements from config or defaults."""
-        # Check if language settings are provided in config
-        if language in self.language_settings:
-            settings = self.language_settings[language]
-            requirements = []
-            
-            # Generate requirements based on config settings
-            if language == 'python':
-                if settings.get('include_type_hints', False):
-                    requirements.append("- Use type hints for all functions")
-                if settings.get('format_with_black', False):
-                    requirements.append("- Format code with Black formatter")
-                requirements.extend([
-                    "- Follow PEP 8 style guide",
-                    "- Use f-strings for string formatting",
-                    "- Prefer list comprehensions where appropriate",
-                    "- Use context managers for file operations"
-                ])
-                
-            elif language == 'javascript':
-                if settings.get('use_es6', False):
-                    requirements.append("- Use modern ES6+ syntax")
-                if settings.get('include_jsdoc', False):
-                    requirements.append("- Include JSDoc comments for all functions")
-                requirements.extend([
-                    "- Use const/let instead of var",
-                    "- Use arrow functions where appropriate",
-                    "- Handle async operations with async/await",
-                    "- Include proper error handling"
-                ])
-                
-            elif language == 'typescript':
-                if settings.get('strict_mode', False):
-                    requirements.append("- Use strict typing throughout")
-                if settings.get('include_interfaces', False):
-                    requirements.append("- Define interfaces for all data structures")
-                requirements.extend([
-                    "- Follow TypeScript best practices",
-                    "- Use enums for constant values",
-                    "- Include JSDoc comments"
-                ])
-                
-            elif language == 'java':
-                if settings.get('package_structure', False):
-                    requirements.append("- Use proper package structure")
-                if settings.get('include_javadoc', False):
-                    requirements.append("- Include Javadoc comments for all public methods")
-                requirements.extend([
-                    "- Follow Java naming conventions",
-                    "- Use appropriate access modifiers",
-                    "- Implement proper exception handling",
-                    "- Use generics where applicable",
-                    "- Follow SOLID principles"
-                ])
-                
-            elif language == 'go':
-                if settings.get('format_with_gofmt', False):
-                    requirements.append("- Format code with gofmt")
-                if settings.get('include_godoc', False):
-                    requirements.append("- Include Godoc comments for all exported functions")
-                requirements.extend([
-                    "- Follow Go idioms and conventions",
-                    "- Handle errors explicitly",
-                    "- Use defer for cleanup",
-                    "- Keep interfaces small",
-                    "- Use goroutines for concurrency where specified"
-                ])
-                
-            else:
-                # For other languages, use default requirements
-                requirements.extend([
-                    "- Follow language best practices and conventions",
-                    "- Use appropriate idioms for the target language",
-                    "- Maintain functional equivalence with the source specification"
-                ])
-            
-            return "\n".join(requirements)
-        
-        # Fallback to hardcoded defaults if no config settings
-        requirements = {
-            'python': """
-            - Use type hints for all functions
-            - Follow PEP 8 style guide
-            - Use f-strings for string formatting
-            - Prefer list comprehensions where appropriate
-            - Use context managers for file operations
-            """,
-            'javascript': """
-            - Use modern ES6+ syntax
-            - Use const/let instead of var
-            - Use arrow functions where appropriate
-            - Handle async operations with async/await
-            - Include proper error handling
-            """,
-            'typescript': """
-            - Define interfaces for all data structures
-            - Use strict typing throughout
-            - Follow TypeScript best practices
-            - Use enums for constant values
-            - Include JSDoc comments
-            """,
-            'java': """
-            - Follow Java naming conventions
-            - Use appropriate access modifiers
-            - Implement proper exception handling
-            - Use generics where applicable
-            - Follow SOLID principles
-            """,
-            'go': """
-            - Follow Go idioms and conventions
-            - Handle errors explicitly
-            - Use defer for cleanup
-            - Keep interfaces small
-            - Use goroutines for concurrency where specified
-            """,
-            'rust': """
-            - Follow Rust ownership rules
-            - Use Result<T, E> for error handling
-            - Implement traits where appropriate
-            - Use match expressions
-            - Follow Rust naming conventions
-            """,
-            'clojure': """
-            - Use idiomatic Clojure syntax with proper parentheses
-            - Use namespaces correctly with ns declarations
-            - Follow Clojure naming conventions (kebab-case for functions/variables)
-            - Use functional programming patterns
-            - Use immutability by default
-            - Use appropriate data structures (maps, vectors, lists, sets)
-            - Include proper documentation strings for functions
-            - Use defn for function definitions
-            - Use let for local bindings
-            """
-        }
-        return requirements.get(language, "Follow language best practices and conventions")
+        requirements = self._language_requirements.get(language)
+        if requirements is None:
+            # Fallback to hardcoded defaults if no config settings
+            requirements = _LANG_REQS.get(language, _DEFAULT_LANG_REQS)
+        return requirements
+
+    def _build_language_requirements(self, language: str) -> str:
+        """Render the requirements block for a language configured in language_settings."""
+        build = _SETTINGS_REQUIREMENTS.get(language, _default_requirements)
+        return "\n".join(build(self.language_settings[language]))
 
     def _get_framework_context(self, state: Dict[str, Any]) -> str:
         """Extract framework context from architecture translation."""
@@ -311,43 +1153,44 @@ class TranslatorAgent(BaseAgent):
         if not arch_translation:
             return "No specific framework context available."
 
-        context_parts = []
-
         # Target framework info
         target_framework = arch_translation.get('target_framework', 'unknown')
-        context_parts.append(f"Target Framework: {target_framework}")
+        context_parts = [f"Target Framework: {target_framework}"]
 
-        # Framework mappings for this translation
+        # Framework mappings for this translation, each section joined in one pass
         mappings = arch_translation.get('architectural_mappings', {})
         if mappings:
-            context_parts.append("Pattern Mappings:")
-            for source_pattern, target_pattern in mappings.items():
-                context_parts.append(f"  {source_pattern} → {target_pattern}")
-
-        # Dependencies available
-        dependencies = arch_translation.get('dependencies', [])
-        if dependencies:
-            context_parts.append("Available Dependencies:")
-            for dep in dependencies[:5]:  # Limit to first 5
-                dep_name = dep.get('name', 'unknown') if isinstance(dep, dict) else str(dep)
-                purpose = dep.get('purpose', '') if isinstance(dep, dict) else ''
-                if purpose:
-                    context_parts.append(f"  {dep_name} - {purpose}")
-                else:
-                    context_parts.append(f"  {dep_name}")
+            context_parts.append("Pattern Mappings:\n" + "\n".join(
+                f"  {source_pattern} → {target_pattern}" for source_pattern, target_pattern in mappings.items()
+            ))
+
+        # Dependencies available, normalized into parallel lists when the architecture was translated;
+        # translations restored from older checkpoints only have the raw list
+        dependency_names = arch_translation.get('dependency_names')
+        if dependency_names is None:
+            dependency_names, dependency_purposes = normalize_dependencies(arch_translation.get('dependencies', []))
+        else:
+            dependency_purposes = arch_translation.get('dependency_purposes', [])
+        if dependency_names:
+            context_parts.append("Available Dependencies:\n" + "\n".join(
+                f"  {name} - {purpose}" if purpose else f"  {name}"
+                for name, purpose in zip(dependency_names[:5], dependency_purposes[:5])  # Limit to first 5
+            ))
 
         # Migration notes
         notes = arch_translation.get('migration_notes', [])
         if notes:
-            context_parts.append("Migration Notes:")
-            for note in notes[:3]:  # Limit to first 3 notes
-                context_parts.append(f"  - {note}")
+            context_parts.append("Migration Notes:\n" + "\n".join(
+                f"  - {note}" for note in notes[:3]  # Limit to first 3 notes
+            ))
 
         # Instructions based on framework
         if target_framework:
-            context_parts.append(f"\nIMPORTANT: Generate code that integrates with {target_framework} framework.")
-            context_parts.append("Use framework-specific patterns, base classes, and conventions.")
-            context_parts.append("Ensure the translated code works with the generated project scaffolding.")
+            context_parts.append(
+                f"\nIMPORTANT: Generate code that integrates with {target_framework} framework.\n"
+                "Use framework-specific patterns, base classes, and conventions.\n"
+                "Ensure the translated code works with the generated project scaffolding."
+            )
 
         return "\n".join(context_parts)
 
@@ -357,57 +1200,9 @@ class TranslatorAgent(BaseAgent):
         target_language: str,
         state: Dict[str, Any]
     ) -> str:
-        imports = []
-        
+        generate = _IMPORT_GENERATORS.get(target_language)
         # Ensure dependencies is not None
-        dependencies = spec.dependencies or []
-        
-        if target_language == 'python':
-            standard_imports = set()
-            for dep in dependencies:
-                if dep.import_type == 'standard':
-                    standard_imports.add(f"import {dep.module}")
-                elif dep.import_type == 'from_import':
-                    parts = dep.module.rsplit('.', 1)
-                    if len(parts) == 2:
-                        imports.append(f"from {parts[0]} import {parts[1]}")
-            
-            imports = list(standard_imports) + imports
-            
-        elif target_language == 'javascript':
-            # Use generic JS imports without language mapping
-            for dep in dependencies:
-                imports.append(f"const {{{dep.module}}} = require('{dep.module}');")
-        
-        elif target_language == 'typescript':
-            # Use generic TS imports without language mapping
-            for dep in dependencies:
-                imports.append(f"import {{{dep.module}}} from '{dep.module}';")
-        
-        elif target_language == 'java':
-            imports.append("import java.util.*;")
-            imports.append("import java.io.*;")
-            # Skip specific mappings for now
-        
-        elif target_language == 'go':
-            imports.append("package main")
-            # Add common Go imports
-            go_imports = ['import (']
-            go_imports.append('    "fmt"')
-            go_imports.append('    "net/http"')
-            go_imports.append(')')
-            imports.extend(go_imports)
-        
-        elif target_language == 'clojure':
-            # Add Clojure namespace declaration
-            if spec and spec.file_path:
-                module_name = Path(spec.file_path).stem.replace('_', '-')
-            else:
-                module_name = 'unknown-module'
-            clojure_imports = [f'(ns {module_name})']
-            imports.extend(clojure_imports)
-        
-        return '\n'.join(imports)
+        return generate(spec, spec.dependencies or []) if generate else ''
     
     def _map_module_name(self, module: str, source_lang: str, target_lang: str) -> Optional[str]:
         if not source_lang or source_lang not in self.language_mappings:
@@ -426,94 +1221,28 @@ class TranslatorAgent(BaseAgent):
 
         code = code.strip()
 
+        # Drop the opening fence line and a closing fence without splitting into lines
         if code.startswith('```'):
-            lines = code.split('\n')
-            if lines[0].startswith('```'):
-                lines = lines[1:]
-            if lines and lines[-1] == '```':
-                lines = lines[:-1]
-            code = '\n'.join(lines)
+            code = code.partition('\n')[2]
+            if code == '```':
+                code = ''
+            elif code.endswith('\n```'):
+                code = code[:-4]
 
-        if language == 'python':
-            if not code.startswith('#!/usr/bin/env python'):
-                code = '#!/usr/bin/env python3\n# -*- coding: utf-8 -*-\n\n' + code
-        
-        # Add Clojure-specific post-processing
-        elif language == 'clojure':
-            if not code.startswith('(ns '):
-                # If no namespace declaration, add a default one
-                if spec and spec.module_name:
-                    module_name = spec.module_name.replace('_', '-')
-                else:
-                    module_name = 'unknown-module'
-                code = f'(ns {module_name})\n\n{code}'
-
-        return code
+        post_process = _LANGUAGE_POST_PROCESSORS.get(language)
+        return post_process(code, spec) if post_process else code
     
     def _generate_output_path(self, original_path: str, target_language: str, output_dir: str) -> str:
         if not original_path:
             raise ValueError("Original path cannot be None or empty")
 
-        path = Path(original_path)
-        
-        extension_map = {
-            'python': '.py',
-            'javascript': '.js',
-            'typescript': '.ts',
-            'java': '.java',
-            'go': '.go',
-            'rust': '.rs',
-            'cpp': '.cpp',
-            'c': '.c',
-            'clojure': '.clj'
-        }
-        
-        new_ext = extension_map.get(target_language, '.txt')
-        new_name = path.stem + new_ext
+        # Plain string ops: this runs once per module and pathlib parsing dominated it
+        parent, name = os.path.split(original_path)
+        stem = os.path.splitext(name)[0]
+        new_name = stem + _EXT_MAP.get(target_language, '.txt')
         
-        output_path = Path(output_dir) / target_language / path.parent / new_name
-        
-        return str(output_path)
+        return os.path.join(output_dir, target_language, parent, new_name)
     
-    def _load_language_mappings(self) -> Dict[str, Dict[str, Dict[str, str]]]:
-        return {
-            'python': {
-                'javascript': {
-                    'os': 'fs',
-                    'sys': 'process',
-                    'json': 'JSON',
-                    'requests': 'axios',
-                    'numpy': 'numeric',
-                    'pandas': 'dataframe-js'
-                },
-                'java': {
-                    'os': 'java.io.File',
-                    'sys': 'java.lang.System',
-                    'json': 'com.google.gson.Gson',
-                    'requests': 'java.net.http.HttpClient'
-                },
-                'go': {
-                    'os': 'os',
-                    'sys': 'os',
-                    'json': 'encoding/json',
-                    'requests': 'net/http'
-                }
-            },
-            'clojure': {
-                'go': {
-                    'ring.adapter.jetty': 'net/http',
-                    'ring.util.response': 'net/http'
-                },
-                'javascript': {
-                    'ring.adapter.jetty': 'express',
-                    'ring.util.response': 'express'
-                },
-                'java': {
-                    'ring.adapter.jetty': 'org.eclipse.jetty',
-                    'ring.util.response': 'javax.servlet.http'
-                }
-            }
-        }
     def _get_architectural_context(self, spec: ModuleSpecification, state: Dict[str, Any]) -> Dict[str, Any]:
         """Extract architectural context from module specification and workflow state."""
         context = {
@@ -525,30 +1254,17 @@ class TranslatorAgent(BaseAgent):
             "domain_context": None
         }
         
-        # Extract from module specification if available
-        if hasattr(spec, 'architectural_context') and spec.architectural_context:
-            context["architectural_context"] = spec.architectural_context
-            
-        if hasattr(spec, 'deployment_pattern') and spec.deployment_pattern:
-            context["deployment_pattern"] = spec.deployment_pattern
-            
-        if hasattr(spec, 'scaling_characteristics') and spec.scaling_characteristics:
-            context["scaling_characteristics"] = spec.scaling_characteristics
-            
-        if hasattr(spec, 'failure_tolerance') and spec.failure_tolerance:
-            context["failure_tolerance"] = spec.failure_tolerance
-            
-        if hasattr(spec, 'infrastructure_assumptions') and spec.infrastructure_assumptions:
-            context["infrastructure_assumptions"] = spec.infrastructure_assumptions
-            
-        if hasattr(spec, 'domain_context') and spec.domain_context:
-            context["domain_context"] = spec.domain_context
+        # Extract from module specification if available; one getattr per field instead of hasattr + access
+        for field in _SPEC_CONTEXT_FIELDS:
+            value = getattr(spec, field, None)
+            if value:
+                context[field] = value
             
         # Extract from workflow state if available
         if state.get('project_spec'):
-            project_spec = state['project_spec']
-            if hasattr(project_spec, 'architectural_context') and project_spec.architectural_context:
-                context["architectural_context"] = project_spec.architectural_context
+            value = getattr(state['project_spec'], 'architectural_context', None)
+            if value:
+                context["architectural_context"] = value
                 
         return context
 
@@ -1,56 +1,65 @@
 import os
 import asyncio
+from collections import Counter, defaultdict
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List, Any, Set, Optional
+from typing import Dict, List, Any, Set, Optional, Tuple, NamedTuple
 from langchain_core.prompts import ChatPromptTemplate
 from .base_agent import BaseAgent
 from ..models.hierarchical_spec import FolderPurpose, FolderSpecification
 from ..persistence.agent_checkpoint import CheckpointManager
+from ..persistence.response_cache import ResponseCache
+from ..utils.serialization import dumps, loads
 import logging
 import fnmatch
 import json
+import re
 
 logger = logging.getLogger(__name__)
 
-class TraverserAgent(BaseAgent):
-    def __init__(self, checkpoint_manager: Optional[CheckpointManager] = None, **kwargs):
-        super().__init__(**kwargs)
-        self.checkpoint_manager = checkpoint_manager
-        self.supported_extensions = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.java': 'java',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.cpp': 'cpp',
-            '.c': 'c',
-            '.rb': 'ruby',
-            '.php': 'php',
-            '.clj': 'clojure',
-            '.cljs': 'clojurescript',
-            '.cljc': 'clojure'
-        }
-        self.ignore_patterns = [
-            '__pycache__', '.git', 'node_modules', '.venv', 'venv',
-            'dist', 'build', '.pytest_cache', '.mypy_cache',
-            '*.pyc', '*.pyo', '*.pyd', '.DS_Store', '*.egg-info'
-        ]
-        
-    def get_prompt(self) -> ChatPromptTemplate:
-        return ChatPromptTemplate.from_messages([
-            ("system", """You are a code analysis agent that identifies module boundaries and dependencies.
+
+def _has_glob(pattern: str) -> bool:
+    return any(c in pattern for c in '*?[')
+
+
+class _DiscoveredFile(NamedTuple):
+    """A supported source file found during traversal, with everything later steps need from it."""
+    rel_path: str
+    name: str
+    language: str
+
+
+_ENTRY_PATTERNS = {
+    'python': frozenset({'main.py', '__main__.py', 'app.py', 'run.py'}),
+    'javascript': frozenset({'index.js', 'main.js', 'app.js', 'server.js'}),
+    'typescript': frozenset({'index.ts', 'main.ts', 'app.ts', 'server.ts'}),
+    'java': frozenset({'Main.java', 'Application.java'}),
+    'go': frozenset({'main.go'}),
+    'rust': frozenset({'main.rs'}),
+    'cpp': frozenset({'main.cpp', 'main.cc'}),
+    'c': frozenset({'main.c'})
+}
+
+# Every language's entry file names, for spotting candidates before the primary language is known
+_ENTRY_NAMES = frozenset().union(*_ENTRY_PATTERNS.values())
+
+
+# Bump whenever the folder analysis prompt changes so cached analyses are not reused
+FOLDER_PROMPT_VERSION = "1"
+
+# Prompts are built once at import and shared by every agent instance
+_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a code analysis agent that identifies module boundaries and dependencies.
             Given a list of files, determine:
             1. The primary programming language
             2. Module boundaries and organization
             3. Entry points and main files
             4. High-level dependency relationships"""),
-            ("human", "Analyze these files and provide module organization: {files}")
-        ])
-    
-    def get_folder_analysis_prompt(self) -> ChatPromptTemplate:
-        return ChatPromptTemplate.from_messages([
-            ("system", """You are analyzing a folder structure to determine semantic purposes.
+    ("human", "Analyze these files and provide module organization: {files}")
+])
+
+_FOLDER_ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are analyzing a folder structure to determine semantic purposes.
 
             Return ONLY valid JSON with this structure:
             {{
@@ -91,8 +100,8 @@ class TraverserAgent(BaseAgent):
             - Technology-specific conventions
 
             JSON RULES: Double quotes only, no trailing commas."""),
-            
-            ("human", """Analyze this folder structure:
+    
+    ("human", """Analyze this folder structure:
 
             Project Type: {project_type}
             Architecture: {architecture}
@@ -105,7 +114,56 @@ class TraverserAgent(BaseAgent):
             {file_distribution}
 
             Return ONLY the JSON analysis.""")
-        ])
+])
+
+
+class TraverserAgent(BaseAgent):
+    def __init__(
+        self,
+        checkpoint_manager: Optional[CheckpointManager] = None,
+        response_cache: Optional[ResponseCache] = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.checkpoint_manager = checkpoint_manager
+        # Folder analyses are keyed by the prompt inputs, so an unchanged tree skips the LLM
+        if response_cache is None and checkpoint_manager:
+            response_cache = ResponseCache.for_checkpoint_dir(checkpoint_manager.checkpoint_dir)
+        self.response_cache = response_cache
+        # Shared across process() calls so batches of projects respect the rate limit
+        self._llm_semaphore = asyncio.BoundedSemaphore(self.rate_limit_config.get('max_concurrent_requests', 2))
+        self.supported_extensions = {
+            '.py': 'python',
+            '.js': 'javascript',
+            '.ts': 'typescript',
+            '.java': 'java',
+            '.go': 'go',
+            '.rs': 'rust',
+            '.cpp': 'cpp',
+            '.c': 'c',
+            '.rb': 'ruby',
+            '.php': 'php',
+            '.clj': 'clojure',
+            '.cljs': 'clojurescript',
+            '.cljc': 'clojure'
+        }
+        self.ignore_patterns = [
+            '__pycache__', '.git', 'node_modules', '.venv', 'venv',
+            'dist', 'build', '.pytest_cache', '.mypy_cache',
+            '*.pyc', '*.pyo', '*.pyd', '.DS_Store', '*.egg-info'
+        ]
+        # Split once into exact names (set lookup) and compiled globs so directories can be pruned cheaply
+        self._ignore_dir_exact = frozenset(p for p in self.ignore_patterns if not _has_glob(p))
+        # One alternation regex for all globs; (?!) never matches when there are none
+        self._ignore_glob_re = re.compile(
+            '|'.join(fnmatch.translate(p) for p in self.ignore_patterns if _has_glob(p)) or r'(?!)'
+        )
+        
+    def get_prompt(self) -> ChatPromptTemplate:
+        return _PROMPT
+    
+    def get_folder_analysis_prompt(self) -> ChatPromptTemplate:
+        return _FOLDER_ANALYSIS_PROMPT
     
     async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         root_path = state.get('root_path', '.')
@@ -131,18 +189,19 @@ class TraverserAgent(BaseAgent):
         
         try:
             # Basic file discovery
-            files = await self._discover_files(root_path)
-            language = self._detect_primary_language(files)
-            modules = await self._identify_modules(files, root_path)
-            entry_points = self._find_entry_points(files, language)
+            discovered = await self._discover_files(root_path)
+            files = [file.rel_path for file in discovered]
+            summary = asyncio.to_thread(self._summarize_files, discovered)
             
-            # Enhanced folder analysis
+            # Enhanced folder analysis; its LLM call overlaps the summary running in a worker thread
             project_spec = state.get('project_spec')
             if project_spec:
-                folder_structure = await self._analyze_folder_structure(
-                    root_path, files, project_spec
+                (language, language_counts, modules, entry_points), folder_structure = await asyncio.gather(
+                    summary, self._analyze_folder_structure(root_path, files, project_spec)
                 )
                 state['folder_structure'] = folder_structure
+            else:
+                language, language_counts, modules, entry_points = await summary
             
             # Update state
             state['file_paths'] = files
@@ -153,10 +212,7 @@ class TraverserAgent(BaseAgent):
             # Update project spec if available
             if project_spec:
                 project_spec.primary_language = language
-                project_spec.languages_used = list(set(
-                    self.supported_extensions.get(Path(f).suffix, 'unknown') 
-                    for f in files
-                ))
+                project_spec.languages_used = list(language_counts)
                 project_spec.total_files = len(files)
                 state['project_spec'] = project_spec
             
@@ -170,13 +226,12 @@ class TraverserAgent(BaseAgent):
                         "modules": modules,
                         "entry_points": entry_points,
                         "folder_structure": state.get('folder_structure'),
-                        "project_spec": (
-                            project_spec.model_dump(mode='json') if hasattr(project_spec, 'model_dump') 
-                            else project_spec.dict() if project_spec else None
-                        )
+                        # Models are passed as-is; the incremental checkpoint encodes each one in a single pass
+                        "project_spec": project_spec
                     },
                     {"status": "completed", "files_discovered": len(files)},
-                    phase="completed"
+                    phase="completed",
+                    incremental=True
                 )
             
             state['messages'].append(f"Discovered {len(files)} files in {language}")
@@ -191,77 +246,69 @@ class TraverserAgent(BaseAgent):
         
         return state
     
-    async def _discover_files(self, root_path: str) -> List[str]:
+    async def _discover_files(self, root_path: str) -> List[_DiscoveredFile]:
+        """Find supported source files under root_path, sorted by relative path, scanning each directory level in parallel threads."""
         files = []
-        root = Path(root_path)
+        # Each frontier entry is (absolute dir path, relative prefix ending in a separator or empty)
+        frontier = [(os.fspath(root_path), '')]
         
-        for path in root.rglob('*'):
-            if path.is_file() and self._should_include_file(path):
-                files.append(str(path.relative_to(root)))
+        while frontier:
+            results = await asyncio.gather(
+                *[asyncio.to_thread(self._scan_dir, dir_path, rel_prefix) for dir_path, rel_prefix in frontier]
+            )
+            frontier = []
+            for dir_files, subdirs in results:
+                files.extend(dir_files)
+                frontier.extend(subdirs)
         
-        return sorted(files)
+        # Paths are unique, so sorting on the path string alone skips tuple-wise comparison
+        files.sort(key=attrgetter('rel_path'))
+        return files
     
-    def _should_include_file(self, path: Path) -> bool:
-        if path.suffix not in self.supported_extensions:
-            return False
-        
-        for pattern in self.ignore_patterns:
-            if any(fnmatch.fnmatch(part, pattern) for part in path.parts):
-                return False
-        
-        return True
+    def _scan_dir(self, dir_path: str, rel_prefix: str) -> Tuple[List[_DiscoveredFile], List[Tuple[str, str]]]:
+        """Read one directory; DirEntry type checks come from the listing itself, so no extra stat per entry."""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Prune ignored trees here so nothing inside them is ever listed
+                        if not self._should_ignore_dir(entry.name):
+                            subdirs.append((entry.path, rel_prefix + entry.name + os.sep))
+                    elif entry.is_file():
+                        language = self.supported_extensions.get(os.path.splitext(entry.name)[1])
+                        if language:
+                            files.append(_DiscoveredFile(rel_prefix + entry.name, entry.name, language))
+        except OSError as e:
+            logger.debug(f"Skipping unreadable directory {dir_path}: {e}")
+        return files, subdirs
     
-    def _detect_primary_language(self, files: List[str]) -> str:
-        language_counts = {}
-        
-        for file in files:
-            ext = Path(file).suffix
-            if ext in self.supported_extensions:
-                lang = self.supported_extensions[ext]
-                language_counts[lang] = language_counts.get(lang, 0) + 1
-        
-        if not language_counts:
-            return "unknown"
-        
-        return max(language_counts, key=language_counts.get)
+    def _should_ignore_dir(self, name: str) -> bool:
+        return name in self._ignore_dir_exact or self._ignore_glob_re.match(name) is not None
     
-    async def _identify_modules(self, files: List[str], root_path: str) -> Dict[str, List[str]]:
-        modules = {}
-        
+    def _summarize_files(
+        self, files: List[_DiscoveredFile]
+    ) -> Tuple[str, Counter, Dict[str, List[str]], List[str]]:
+        """Count languages and bucket modules in one pass, then pick entry points for the primary language."""
+        language_counts = Counter()
+        modules: Dict[str, List[str]] = {}
+        # Entry-point candidates in file order; only these are revisited once the language is known
+        candidates: List[Tuple[_DiscoveredFile, bool]] = []
         for file in files:
-            parts = Path(file).parts
-            if len(parts) > 1:
-                module_name = parts[0]
-            else:
-                module_name = "root"
-            
-            if module_name not in modules:
-                modules[module_name] = []
-            modules[module_name].append(file)
+            language_counts[file.language] += 1
+            top_dir, sep, _ = file.rel_path.partition(os.sep)
+            modules.setdefault(top_dir if sep else "root", []).append(file.rel_path)
+            is_main = 'main' in file.name.lower()
+            if is_main or file.name in _ENTRY_NAMES:
+                candidates.append((file, is_main))
         
-        return modules
-    
-    def _find_entry_points(self, files: List[str], language: str) -> List[str]:
-        entry_points = []
-        entry_patterns = {
-            'python': ['main.py', '__main__.py', 'app.py', 'run.py'],
-            'javascript': ['index.js', 'main.js', 'app.js', 'server.js'],
-            'typescript': ['index.ts', 'main.ts', 'app.ts', 'server.ts'],
-            'java': ['Main.java', 'Application.java'],
-            'go': ['main.go'],
-            'rust': ['main.rs'],
-            'cpp': ['main.cpp', 'main.cc'],
-            'c': ['main.c']
-        }
+        language = language_counts.most_common(1)[0][0] if language_counts else "unknown"
         
-        patterns = entry_patterns.get(language, [])
+        patterns = _ENTRY_PATTERNS.get(language, frozenset())
+        entry_points = [file.rel_path for file, is_main in candidates if is_main or file.name in patterns]
         
-        for file in files:
-            filename = Path(file).name
-            if filename in patterns or 'main' in filename.lower():
-                entry_points.append(file)
-        
-        return entry_points
+        return language, language_counts, modules, entry_points
     
     async def _analyze_folder_structure(
         self, 
@@ -273,28 +320,42 @@ class TraverserAgent(BaseAgent):
         root = Path(root_path)
         
         # Build directory tree
-        folders = set()
+        folders: Set[str] = set()
+        add_folder = folders.add
+        dirname = os.path.dirname
         for file_path in files:
-            path = Path(file_path)
-            while path.parent != Path('.'):
-                folders.add(str(path.parent))
-                path = path.parent
+            folder = dirname(file_path)
+            # Stop at the first folder already seen; its ancestors were added with it
+            while folder and folder not in folders:
+                add_folder(folder)
+                folder = dirname(folder)
         
         # Get folder information
         folder_info = self._get_folder_info(root, folders, files)
         
         try:
-            # Use LLM to analyze folder purposes
-            prompt = self.get_folder_analysis_prompt()
-            chain = prompt | self.llm
-            
-            response = await chain.ainvoke({
+            inputs = {
                 "project_type": project_spec.project_type.value if project_spec else "unknown",
                 "architecture": project_spec.architecture.value if project_spec else "unknown", 
                 "language": project_spec.primary_language if project_spec else "unknown",
                 "folder_structure": self._format_folder_tree(root, folders),
-                "file_distribution": json.dumps(folder_info, indent=2)[:2000]
-            })
+                "file_distribution": dumps(folder_info, indent=True)[:2000]
+            }
+            cache_key = ResponseCache.make_key(
+                FOLDER_PROMPT_VERSION, self.model_identity, json.dumps(inputs, sort_keys=True)
+            )
+            if self.response_cache:
+                cached = await asyncio.to_thread(self.response_cache.get, "traverser_folders", cache_key)
+                if cached is not None:
+                    logger.info("Using cached folder analysis")
+                    return self._create_folder_specs(cached.get('folders', []), root, files)
+            
+            # Use LLM to analyze folder purposes
+            prompt = self.get_folder_analysis_prompt()
+            chain = prompt | self.llm
+            
+            async with self._llm_semaphore:
+                response = await chain.ainvoke(inputs)
             
             # Parse response
             content = response.content.strip()
@@ -305,7 +366,9 @@ class TraverserAgent(BaseAgent):
             if content.endswith('```'):
                 content = content[:-3]
             
-            analysis = json.loads(content.strip())
+            analysis = loads(content.strip())
+            if self.response_cache:
+                await asyncio.to_thread(self.response_cache.set, "traverser_folders", cache_key, analysis)
             
             # Create folder specifications
             return self._create_folder_specs(analysis.get('folders', []), root, files)
@@ -317,21 +380,24 @@ class TraverserAgent(BaseAgent):
     
     def _get_folder_info(self, root: Path, folders: Set[str], files: List[str]) -> Dict[str, Any]:
         """Get information about each folder."""
-        folder_info = {}
+        # Sorted so the rendered info (and the response-cache key built from it) is the same every run
+        folder_info = {
+            folder: {"file_count": 0, "file_types": {}, "sample_files": []}
+            for folder in sorted(folders)
+        }
         
-        for folder in folders:
-            folder_files = [f for f in files if f.startswith(folder + '/')]
-            file_types = {}
-            
-            for file_path in folder_files:
-                ext = Path(file_path).suffix
-                file_types[ext] = file_types.get(ext, 0) + 1
-            
-            folder_info[folder] = {
-                "file_count": len(folder_files),
-                "file_types": file_types,
-                "sample_files": folder_files[:5]  # First 5 files as examples
-            }
+        # One pass over files, crediting each file to its directory and every ancestor
+        for file_path in files:
+            ext = os.path.splitext(file_path)[1]
+            folder = os.path.dirname(file_path)
+            while folder:
+                info = folder_info.get(folder)
+                if info is not None:
+                    info["file_count"] += 1
+                    info["file_types"][ext] = info["file_types"].get(ext, 0) + 1
+                    if len(info["sample_files"]) < 5:  # First 5 files as examples
+                        info["sample_files"].append(file_path)
+                folder = os.path.dirname(folder)
         
         return folder_info
     
@@ -341,9 +407,9 @@ class TraverserAgent(BaseAgent):
         sorted_folders = sorted(folders)
         
         for i, folder in enumerate(sorted_folders[:20]):  # Limit to 20 folders
-            depth = len(Path(folder).parts) - 1
+            depth = folder.count(os.sep)
             indent = "  " * depth
-            folder_name = Path(folder).name
+            folder_name = os.path.basename(folder)
             lines.append(f"{indent}├── {folder_name}/")
         
         return "\n".join(lines)
@@ -378,44 +444,62 @@ class TraverserAgent(BaseAgent):
         folder_purposes: Dict[str, Dict], 
         files: List[str]
     ) -> FolderSpecification:
-        """Recursively build folder hierarchy."""
-        # Get files in current directory
-        current_files = [
-            f for f in files 
-            if Path(f).parent == Path(current_path) or (current_path == "." and '/' not in f)
-        ]
-        
-        # Get subfolders
-        subfolders = set()
+        """Build the folder hierarchy rooted at current_path from a one-pass directory index."""
+        children: Dict[str, Set[str]] = defaultdict(set)
+        files_by_dir: Dict[str, List[str]] = defaultdict(list)
         for file_path in files:
-            if file_path.startswith(current_path + '/') or current_path == ".":
-                relative_path = file_path[len(current_path):].lstrip('/')
-                if '/' in relative_path:
-                    first_dir = relative_path.split('/')[0]
-                    if current_path == ".":
-                        subfolders.add(first_dir)
-                    else:
-                        subfolders.add(f"{current_path}/{first_dir}")
+            folder = os.path.dirname(file_path) or "."
+            files_by_dir[folder].append(file_path)
+            # Register the folder under each ancestor, stopping once a link already exists
+            while folder != ".":
+                parent = os.path.dirname(folder) or "."
+                if folder in children[parent]:
+                    break
+                children[parent].add(folder)
+                folder = parent
         
-        # Get folder info
+        return self._build_folder_node(current_path, folder_purposes, children, files_by_dir)
+    
+    def _build_folder_node(
+        self,
+        current_path: str,
+        folder_purposes: Dict[str, Dict],
+        children: Dict[str, Set[str]],
+        files_by_dir: Dict[str, List[str]]
+    ) -> FolderSpecification:
+        """Recursively build one folder's spec from the directory index."""
         folder_info = folder_purposes.get(current_path, {})
         purpose = folder_info.get('purpose', FolderPurpose.UNKNOWN)
-        description = folder_info.get('description', f"Directory: {Path(current_path).name}")
+        folder_name = os.path.basename(current_path) if current_path != "." else ""
+        description = folder_info.get('description', f"Directory: {folder_name}")
+        
+        subfolder_specs = [
+            self._build_folder_node(subfolder_path, folder_purposes, children, files_by_dir)
+            for subfolder_path in sorted(children.get(current_path, ()))
+        ]
+        file_count = len(files_by_dir.get(current_path, ()))
         
-        # Create subfolder specs
-        subfolder_specs = []
-        for subfolder_path in sorted(subfolders):
-            subfolder_spec = self._build_folder_hierarchy(subfolder_path, folder_purposes, files)
-            subfolder_specs.append(subfolder_spec)
+        # Collapse pass-through folders (no files, one child, nothing known about them) into
+        # their child; the child keeps its full path and the name records the skipped segment
+        if (
+            current_path != "."
+            and len(subfolder_specs) == 1
+            and not file_count
+            and purpose == FolderPurpose.UNKNOWN
+            and current_path not in folder_purposes
+        ):
+            child = subfolder_specs[0]
+            child.name = os.path.join(folder_name, child.name)
+            return child
         
         return FolderSpecification(
             path=current_path,
-            name=Path(current_path).name or "root",
+            name=folder_name or "root",
             purpose=purpose,
             description=description,
             files=[],  # Will be populated later with FileSpecification objects
             subfolders=subfolder_specs,
-            file_count=len(current_files),
+            file_count=file_count,
             total_lines=0  # Will be calculated later
         )
     
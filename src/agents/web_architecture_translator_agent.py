@@ -1,146 +1,236 @@
 """
 Web Architecture Translator Agent with web research for current framework information.
 """
+import asyncio
 import json
 import logging
-from typing import Dict, List, Any, Optional
+import time
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.tools import tool
+from langchain_core.tools import BaseTool, tool
 from .base_agent import BaseAgent
 from ..models.hierarchical_spec import ProjectSpecification
 from ..persistence.agent_checkpoint import CheckpointManager
+from ..persistence.response_cache import ResponseCache
+from ..utils.architecture_guidance import architecture_guidance, normalize_dependencies
+from ..utils.project_management import write_output_files
+from ..utils.serialization import loads
 
 logger = logging.getLogger(__name__)
 
-# Define tools for architecture research
-@tool
-def research_target_frameworks(source_framework: str, target_language: str) -> str:
-    """Research equivalent frameworks in the target language for a given source framework.
+# langchain-community is optional - research tools report web search as unavailable without it
+try:
+    from langchain_community.tools import DuckDuckGoSearchRun
+    _SEARCH = DuckDuckGoSearchRun()
+    WEB_SEARCH_AVAILABLE = True
+except ImportError:
+    _SEARCH = None
+    WEB_SEARCH_AVAILABLE = False
+
+_SEARCH_UNAVAILABLE = "Web search unavailable. Install langchain-community: pip install langchain-community"
+
+# Upper bound on research searches in flight at once
+_RESEARCH_CONCURRENCY = 4
+
+# Persisted search results older than this are fetched again; queries cite "latest" and "2024" practices
+_RESEARCH_TTL_SECONDS = 86400
+
+# Tech-stack entries that identify the source framework, in precedence order, with its features
+_FRAMEWORK_TABLE = {
+    # Ruby frameworks
+    'sidekiq': ('background_jobs', 'redis_queue', 'worker_pools'),
+    'rails': ('mvc', 'active_record', 'action_controller'),
+    # Python frameworks
+    'django': ('mvc', 'orm', 'admin_interface'),
+    'celery': ('distributed_tasks', 'message_broker'),
+    'fastapi': ('async', 'openapi', 'pydantic'),
+    # Node.js frameworks
+    'express': ('middleware', 'routing'),
+    'bull': ('redis_queue', 'job_processing'),
+    # Java frameworks
+    'spring': ('dependency_injection', 'mvc', 'boot'),
+}
+
+# Worker framework assumed for background-worker projects whose stack names none
+_DEFAULT_WORKER_FRAMEWORKS = {
+    'ruby': 'sidekiq',
+    'python': 'celery',
+    'javascript': 'bull',
+}
+
+# Substring keywords mapped to the external dependency they imply, in precedence order
+_DEPENDENCY_KEYWORDS = (
+    ('redis', 'redis'),
+    ('postgres', 'postgresql'),
+    ('mysql', 'mysql'),
+    ('mongodb', 'mongodb'),
+    ('rabbitmq', 'rabbitmq'),
+    ('kafka', 'kafka'),
+)
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _parse_json_object(content: str) -> Dict[str, Any]:
+    """Decode the first JSON object in an LLM reply, ignoring code fences or prose around it."""
+    start = content.find('{')
+    if start < 0:
+        raise ValueError("No JSON object found in LLM response")
+    # Usually the object runs to the last brace and orjson can take it whole; prose with braces
+    # after the object falls back to the incremental stdlib decoder
+    try:
+        return loads(content[start:content.rfind('}') + 1])
+    except ValueError:
+        return _JSON_DECODER.raw_decode(content, start)[0]
 
-    Args:
-        source_framework: Source framework name (e.g., "sidekiq", "django", "express")
-        target_language: Target programming language (e.g., "go", "python", "javascript")
 
-    Returns:
-        Information about equivalent frameworks in the target language
-    """
-    try:
-        from langchain_community.tools import DuckDuckGoSearchRun
-        search = DuckDuckGoSearchRun()
+def _build_research_tools(search: Callable[[str], str]) -> List[BaseTool]:
+    """Create the research tools around an agent's search function, so each agent keeps its own cache."""
 
-        query = f"{source_framework} equivalent {target_language} alternative framework migration"
-        results = search.run(query)
+    @tool
+    def research_target_frameworks(source_framework: str, target_language: str) -> str:
+        """Research equivalent frameworks in the target language for a given source framework.
 
-        return f"Equivalent frameworks for {source_framework} in {target_language}:\n{results}"
-    except ImportError:
-        return f"Web search unavailable. Install langchain-community: pip install langchain-community"
-    except Exception as e:
-        return f"Framework research failed: {str(e)}"
+        Args:
+            source_framework: Source framework name (e.g., "sidekiq", "django", "express")
+            target_language: Target programming language (e.g., "go", "python", "javascript")
 
-@tool
-def get_framework_best_practices(framework_name: str, language: str) -> str:
-    """Get current best practices and patterns for a specific framework.
+        Returns:
+            Information about equivalent frameworks in the target language
+        """
+        if not WEB_SEARCH_AVAILABLE:
+            return _SEARCH_UNAVAILABLE
+        try:
+            query = f"{source_framework} equivalent {target_language} alternative framework migration"
+            results = search(query)
 
-    Args:
-        framework_name: Framework to research (e.g., "asynq", "gin", "fastapi")
-        language: Programming language (e.g., "go", "python", "javascript")
+            return f"Equivalent frameworks for {source_framework} in {target_language}:\n{results}"
+        except Exception as e:
+            return f"Framework research failed: {str(e)}"
 
-    Returns:
-        Best practices, patterns, and setup recommendations
-    """
-    try:
-        from langchain_community.tools import DuckDuckGoSearchRun
-        search = DuckDuckGoSearchRun()
+    @tool
+    def get_framework_best_practices(framework_name: str, language: str) -> str:
+        """Get current best practices and patterns for a specific framework.
 
-        query = f"{framework_name} {language} best practices setup patterns 2024"
-        results = search.run(query)
+        Args:
+            framework_name: Framework to research (e.g., "asynq", "gin", "fastapi")
+            language: Programming language (e.g., "go", "python", "javascript")
 
-        return f"Best practices for {framework_name} ({language}):\n{results}"
-    except ImportError:
-        return f"Web search unavailable. Install langchain-community: pip install langchain-community"
-    except Exception as e:
-        return f"Best practices research failed: {str(e)}"
+        Returns:
+            Best practices, patterns, and setup recommendations
+        """
+        if not WEB_SEARCH_AVAILABLE:
+            return _SEARCH_UNAVAILABLE
+        try:
+            query = f"{framework_name} {language} best practices setup patterns 2024"
+            results = search(query)
 
-@tool
-def check_framework_compatibility(framework_name: str, language: str) -> str:
-    """Check compatibility, current versions, and dependencies for a framework.
+            return f"Best practices for {framework_name} ({language}):\n{results}"
+        except Exception as e:
+            return f"Best practices research failed: {str(e)}"
 
-    Args:
-        framework_name: Framework to check (e.g., "asynq", "machinery", "celery")
-        language: Programming language (e.g., "go", "python")
+    @tool
+    def check_framework_compatibility(framework_name: str, language: str) -> str:
+        """Check compatibility, current versions, and dependencies for a framework.
 
-    Returns:
-        Compatibility information, versions, and dependencies
-    """
-    try:
-        from langchain_community.tools import DuckDuckGoSearchRun
-        search = DuckDuckGoSearchRun()
+        Args:
+            framework_name: Framework to check (e.g., "asynq", "machinery", "celery")
+            language: Programming language (e.g., "go", "python")
 
-        query = f"{framework_name} {language} latest version dependencies compatibility requirements"
-        results = search.run(query)
+        Returns:
+            Compatibility information, versions, and dependencies
+        """
+        if not WEB_SEARCH_AVAILABLE:
+            return _SEARCH_UNAVAILABLE
+        try:
+            query = f"{framework_name} {language} latest version dependencies compatibility requirements"
+            results = search(query)
 
-        return f"Compatibility info for {framework_name} ({language}):\n{results}"
-    except ImportError:
-        return f"Web search unavailable. Install langchain-community: pip install langchain-community"
-    except Exception as e:
-        return f"Compatibility check failed: {str(e)}"
+            return f"Compatibility info for {framework_name} ({language}):\n{results}"
+        except Exception as e:
+            return f"Compatibility check failed: {str(e)}"
 
-@tool
-def research_migration_patterns(source_framework: str, target_framework: str) -> str:
-    """Research migration patterns and examples from source to target framework.
+    @tool
+    def research_migration_patterns(source_framework: str, target_framework: str) -> str:
+        """Research migration patterns and examples from source to target framework.
 
-    Args:
-        source_framework: Source framework (e.g., "sidekiq", "rails")
-        target_framework: Target framework (e.g., "asynq", "gin")
+        Args:
+            source_framework: Source framework (e.g., "sidekiq", "rails")
+            target_framework: Target framework (e.g., "asynq", "gin")
 
-    Returns:
-        Migration patterns, examples, and common mappings
-    """
-    try:
-        from langchain_community.tools import DuckDuckGoSearchRun
-        search = DuckDuckGoSearchRun()
+        Returns:
+            Migration patterns, examples, and common mappings
+        """
+        if not WEB_SEARCH_AVAILABLE:
+            return _SEARCH_UNAVAILABLE
+        try:
+            query = f"migrate {source_framework} to {target_framework} examples patterns guide"
+            results = search(query)
 
-        query = f"migrate {source_framework} to {target_framework} examples patterns guide"
-        results = search.run(query)
+            return f"Migration patterns from {source_framework} to {target_framework}:\n{results}"
+        except Exception as e:
+            return f"Migration research failed: {str(e)}"
 
-        return f"Migration patterns from {source_framework} to {target_framework}:\n{results}"
-    except ImportError:
-        return f"Web search unavailable. Install langchain-community: pip install langchain-community"
-    except Exception as e:
-        return f"Migration research failed: {str(e)}"
+    return [
+        research_target_frameworks,
+        get_framework_best_practices,
+        check_framework_compatibility,
+        research_migration_patterns
+    ]
 
 
 class WebArchitectureTranslatorAgent(BaseAgent):
     """Web Architecture Translator with web research capabilities."""
 
-    def __init__(self, checkpoint_manager: Optional[CheckpointManager] = None, **kwargs):
-        # Set up tools
-        tools = [
-            research_target_frameworks,
-            get_framework_best_practices,
-            check_framework_compatibility,
-            research_migration_patterns
-        ]
-
-        # Initialize parent with tools
-        super().__init__(tools=tools, **kwargs)
+    def __init__(
+        self,
+        checkpoint_manager: Optional[CheckpointManager] = None,
+        response_cache: Optional[ResponseCache] = None,
+        research_ttl_seconds: float = _RESEARCH_TTL_SECONDS,
+        refresh_research: bool = False,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
         self.checkpoint_manager = checkpoint_manager
+        # Search results are keyed by query text, so repeated frameworks skip the network
+        if response_cache is None and checkpoint_manager:
+            response_cache = ResponseCache.for_checkpoint_dir(checkpoint_manager.checkpoint_dir)
+        self.response_cache = response_cache
+        self.research_ttl_seconds = research_ttl_seconds
+        # Ignore persisted results (fresh ones are still stored) when current information is required
+        self.refresh_research = refresh_research
+        # Results fetched by this agent, so repeated queries within a process skip the network
+        self._search_results: Dict[str, Tuple[float, str]] = {}
+        # Research tools are run by the agent up front, concurrently, rather than bound to the LLM
+        # where each call would cost a sequential model round-trip
+        self.research_tools = _build_research_tools(self._search)
+        self._research_tools_by_name = {research_tool.name: research_tool for research_tool in self.research_tools}
+        # Prompt template and chain are built once and reused for every translation
+        self._prompt = self._build_prompt()
+        self._chain = self._prompt | self.llm
 
     def get_prompt(self) -> ChatPromptTemplate:
+        return self._prompt
+
+    def create_chain(self):
+        # Reuse the chain composed in __init__ instead of re-piping prompt | llm per call
+        return self._chain
+
+    def _build_prompt(self) -> ChatPromptTemplate:
         return ChatPromptTemplate.from_messages([
             ("system", """You are an expert software architect with web research capabilities for framework migration.
 
-            You have access to these research tools:
-            - research_target_frameworks: Find equivalent frameworks in target language
-            - get_framework_best_practices: Get current best practices for frameworks
-            - check_framework_compatibility: Check versions and compatibility requirements
-            - research_migration_patterns: Find migration examples and patterns
+            You are given web research results covering:
+            - Equivalent frameworks in the target language
+            - Current best practices for those frameworks
+            - Versions and compatibility requirements
+            - Migration examples and patterns
 
             PROCESS:
-            1. Research equivalent frameworks for the source framework in the target language
-            2. Check best practices and current patterns for top candidates
+            1. Identify equivalent frameworks for the source framework in the target language
+            2. Compare best practices and current patterns for top candidates
             3. Verify compatibility and version requirements
-            4. Research specific migration patterns if available
+            4. Apply specific migration patterns if available
             5. Generate complete project scaffolding based on research
 
             Return ONLY valid JSON with this structure:
@@ -185,7 +275,10 @@ class WebArchitectureTranslatorAgent(BaseAgent):
             Dependencies: {dependencies}
             Features: {features}
 
-            Use web research to find the best target framework and generate current scaffolding.""")
+            Web Research:
+            {research}
+
+            Use the web research to find the best target framework and generate current scaffolding.""")
         ])
 
     async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -224,10 +317,13 @@ class WebArchitectureTranslatorAgent(BaseAgent):
             )
 
             # Store in state - scaffolding files come directly from LLM response
+            dependency_names, dependency_purposes = normalize_dependencies(translation['dependencies'])
             state['architecture_translation'] = {
                 'source_framework': source_framework,
                 'target_framework': translation['target_framework'],
                 'dependencies': translation['dependencies'],
+                'dependency_names': dependency_names,
+                'dependency_purposes': dependency_purposes,
                 'project_structure': translation['project_structure'],
                 'architectural_mappings': translation['architectural_mappings'],
                 'scaffolding_files': translation.get('scaffolding_files', {}),
@@ -240,16 +336,7 @@ class WebArchitectureTranslatorAgent(BaseAgent):
             if scaffolding_files:
                 from pathlib import Path
                 output_path = Path(state.get('target_output_path', state.get('output_path', 'translated')))
-                output_path.mkdir(parents=True, exist_ok=True)
-
-                files_written = 0
-                for file_path, content in scaffolding_files.items():
-                    full_path = output_path / file_path
-                    full_path.parent.mkdir(parents=True, exist_ok=True)
-                    with open(full_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    files_written += 1
-
+                files_written = await write_output_files(output_path, scaffolding_files)
                 logger.info(f"Generated {files_written} research-based scaffolding files in {output_path}")
 
             # Checkpoint the completed translation
@@ -288,51 +375,18 @@ class WebArchitectureTranslatorAgent(BaseAgent):
                 framework_info['version'] = primary_fw.get('version')
                 return framework_info
 
-        # Fallback to technology stack analysis
-        tech_stack = project_spec.technology_stack
-
-        # Ruby frameworks
-        if 'sidekiq' in [t.lower() for t in tech_stack]:
-            framework_info['name'] = 'sidekiq'
-            framework_info['features'] = ['background_jobs', 'redis_queue', 'worker_pools']
-        elif 'rails' in [t.lower() for t in tech_stack]:
-            framework_info['name'] = 'rails'
-            framework_info['features'] = ['mvc', 'active_record', 'action_controller']
-
-        # Python frameworks
-        elif 'django' in [t.lower() for t in tech_stack]:
-            framework_info['name'] = 'django'
-            framework_info['features'] = ['mvc', 'orm', 'admin_interface']
-        elif 'celery' in [t.lower() for t in tech_stack]:
-            framework_info['name'] = 'celery'
-            framework_info['features'] = ['distributed_tasks', 'message_broker']
-        elif 'fastapi' in [t.lower() for t in tech_stack]:
-            framework_info['name'] = 'fastapi'
-            framework_info['features'] = ['async', 'openapi', 'pydantic']
-
-        # Node.js frameworks
-        elif 'express' in [t.lower() for t in tech_stack]:
-            framework_info['name'] = 'express'
-            framework_info['features'] = ['middleware', 'routing']
-        elif 'bull' in [t.lower() for t in tech_stack]:
-            framework_info['name'] = 'bull'
-            framework_info['features'] = ['redis_queue', 'job_processing']
-
-        # Java frameworks
-        elif 'spring' in [t.lower() for t in tech_stack]:
-            framework_info['name'] = 'spring'
-            framework_info['features'] = ['dependency_injection', 'mvc', 'boot']
+        # Fallback to technology stack analysis; the table is ordered by precedence
+        stack_lower = {t.lower() for t in project_spec.technology_stack}
+        for key, features in _FRAMEWORK_TABLE.items():
+            if key in stack_lower:
+                framework_info['name'] = key
+                framework_info['features'] = list(features)
+                break
 
         # Check project type for additional hints
-        if project_spec.project_type.value == 'background_worker':
-            if framework_info['name'] == 'unknown':
-                # Infer worker framework based on language
-                if project_spec.primary_language == 'ruby':
-                    framework_info['name'] = 'sidekiq'
-                elif project_spec.primary_language == 'python':
-                    framework_info['name'] = 'celery'
-                elif project_spec.primary_language == 'javascript':
-                    framework_info['name'] = 'bull'
+        if project_spec.project_type.value == 'background_worker' and framework_info['name'] == 'unknown':
+            # Infer worker framework based on language
+            framework_info['name'] = _DEFAULT_WORKER_FRAMEWORKS.get(project_spec.primary_language, 'unknown')
 
         return framework_info
 
@@ -344,52 +398,129 @@ class WebArchitectureTranslatorAgent(BaseAgent):
         state: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Use LLM with web research tools to determine target architecture."""
-        prompt = self.get_prompt()
-        chain = prompt | self.llm
-
         # Prepare input data
         features = source_framework.get('features', [])
         dependencies = self._extract_dependencies(project_spec, state)
 
-        # The LLM will automatically use the research tools during processing
-        response = await chain.ainvoke({
+        # Known pairs use the curated mapping; otherwise all searches are independent, so they
+        # run together before the single synthesis call
+        research = self._known_mapping_research(
+            source_framework['name'], project_spec.primary_language, target_language, project_spec.project_type.value
+        )
+        if research is None:
+            research = await self._run_research(
+                self._plan_research(source_framework['name'], target_language, project_spec.project_type.value)
+            )
+        else:
+            logger.info(f"Using curated mapping for {source_framework['name']} -> {target_language}; skipping web research")
+
+        response = await self._chain.ainvoke({
             "target_language": target_language,
             "project_type": project_spec.project_type.value,
             "framework": source_framework['name'],
             "tech_stack": ", ".join(project_spec.technology_stack),
             "dependencies": ", ".join(dependencies),
-            "features": ", ".join(features)
+            "features": ", ".join(features),
+            "research": research
         })
 
-        # Parse response
-        content = response.content.strip()
-        if content.startswith('```json'):
-            content = content[7:]
-        if content.startswith('```'):
-            content = content[3:]
-        if content.endswith('```'):
-            content = content[:-3]
+        return _parse_json_object(response.content)
+
+    def _known_mapping_research(
+        self,
+        source_framework: str,
+        source_language: str,
+        target_language: str,
+        project_type: str
+    ) -> Optional[str]:
+        """Render the curated mapping for a source framework and target language, or None if there is none."""
+        # Only curated mappings count; the category-based fallback is a guess that research should confirm
+        match = architecture_guidance.find_best_target_framework(
+            source_framework, source_language, target_language, allow_fallback=False
+        )
+        if not match:
+            return None
+
+        target, mapping = match
+        sections = [
+            f"Curated mapping (compatibility {mapping.compatibility_score:.2f}): "
+            f"{source_framework} -> {target.name} ({target.language})",
+            f"{target.name}: {target.description}",
+            "Features: " + ", ".join(target.features),
+            "Dependencies: " + ", ".join(target.dependencies),
+            "Migration notes:\n" + "\n".join(f"- {note}" for note in mapping.migration_notes),
+            "Pattern mappings:\n" + "\n".join(
+                f"- {source} -> {dest}" for source, dest in mapping.pattern_mappings.items()
+            ),
+        ]
+        structure = architecture_guidance.get_project_structure_template(target, project_type)
+        if structure:
+            sections.append(f"Recommended project structure: {json.dumps(structure)}")
+        return "\n".join(sections)
+
+    def _plan_research(
+        self,
+        source_framework: str,
+        target_language: str,
+        project_type: str
+    ) -> List[Tuple[BaseTool, Dict[str, str]]]:
+        """Plan one search per research tool; none depends on another's result."""
+        tools = self._research_tools_by_name
+        return [
+            (tools['research_target_frameworks'], {"source_framework": source_framework, "target_language": target_language}),
+            (tools['get_framework_best_practices'], {"framework_name": f"{project_type} framework", "language": target_language}),
+            (tools['check_framework_compatibility'], {"framework_name": f"{source_framework} alternative", "language": target_language}),
+            (tools['research_migration_patterns'], {"source_framework": source_framework, "target_framework": f"{target_language} framework"}),
+        ]
 
-        return json.loads(content.strip())
+    async def _run_research(self, plan: List[Tuple[BaseTool, Dict[str, str]]]) -> str:
+        """Run planned searches concurrently and join their findings in plan order."""
+        semaphore = asyncio.Semaphore(_RESEARCH_CONCURRENCY)
+
+        async def run_one(research_tool: BaseTool, args: Dict[str, str]) -> str:
+            async with semaphore:
+                try:
+                    return await research_tool.ainvoke(args)
+                except Exception as e:
+                    return f"{research_tool.name} failed: {e}"
+
+        results = await asyncio.gather(*[run_one(research_tool, args) for research_tool, args in plan])
+        return "\n\n".join(results)
+
+    def _search(self, query: str) -> str:
+        """Run a web search, reusing results younger than the TTL from this agent and the response cache."""
+        # Search engines ignore case and spacing, so queries differing only in those share one result
+        query = " ".join(query.lower().split())
+        now = time.time()
+        hit = self._search_results.get(query)
+        if hit and now - hit[0] < self.research_ttl_seconds:
+            return hit[1]
+
+        cache_key = ResponseCache.make_key(query)
+        if self.response_cache and not self.refresh_research:
+            cached = self.response_cache.get("arch_research", cache_key)
+            # Entries without a timestamp predate the TTL and count as expired
+            if isinstance(cached, dict) and now - cached['fetched_at'] < self.research_ttl_seconds:
+                self._search_results[query] = (cached['fetched_at'], cached['results'])
+                return cached['results']
+
+        results = _SEARCH.run(query)
+
+        self._search_results[query] = (now, results)
+        if self.response_cache:
+            self.response_cache.set("arch_research", cache_key, {"results": results, "fetched_at": now})
+        return results
 
     def _extract_dependencies(self, project_spec: ProjectSpecification, state: Dict[str, Any]) -> List[str]:
         """Extract external dependencies from project."""
         deps = []
 
-        # Check technology stack for databases, caches, etc.
+        # Check technology stack for databases, caches, etc.; the first matching keyword wins
         for tech in project_spec.technology_stack:
             tech_lower = tech.lower()
-            if 'redis' in tech_lower:
-                deps.append('redis')
-            elif 'postgres' in tech_lower or 'postgresql' in tech_lower:
-                deps.append('postgresql')
-            elif 'mysql' in tech_lower:
-                deps.append('mysql')
-            elif 'mongodb' in tech_lower:
-                deps.append('mongodb')
-            elif 'rabbitmq' in tech_lower:
-                deps.append('rabbitmq')
-            elif 'kafka' in tech_lower:
-                deps.append('kafka')
+            for keyword, dependency in _DEPENDENCY_KEYWORDS:
+                if keyword in tech_lower:
+                    deps.append(dependency)
+                    break
 
         return deps
\ No newline at end of file
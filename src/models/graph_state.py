@@ -18,7 +18,9 @@ class TranslationState(TypedDict):
     source_spec: CodebaseSpecification
     target_language: str
     current_module: Optional[ModuleSpecification]
-    translated_modules: Dict[str, str]
+    # Parallel maps keyed by original file path
+    codes: Dict[str, str]
+    output_paths: Dict[str, str]
     translation_mapping: Dict[str, Dict[str, Any]]
     output_path: str
     errors: List[Dict[str, Any]]
@@ -1,7 +1,10 @@
+from functools import cached_property
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from enum import Enum
 
+from ..utils.serialization import model_to_json
+
 class DataType(BaseModel):
     name: str
     type: str
@@ -83,6 +86,11 @@ class ModuleSpecification(BaseModel):
     
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
+    @cached_property
+    def compact_json(self) -> str:
+        """Unindented JSON of this spec, serialized once per instance for prompt building."""
+        return model_to_json(self)
+
 class CodebaseSpecification(BaseModel):
     project_name: str
     root_path: str
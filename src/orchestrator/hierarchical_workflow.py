@@ -7,6 +7,7 @@ from pathlib import Path
 import asyncio
 import logging
 import hashlib
+import os
 from uuid import UUID
 
 from ..models.graph_state import OrchestratorState
@@ -19,8 +20,9 @@ from ..agents.documenter_agent import DocumenterAgent
 from ..agents.translator_agent import TranslatorAgent
 from ..agents.gap_filler_agent import GapFillerAgent
 from ..persistence.agent_checkpoint import CheckpointManager, WorkflowCheckpoint
+from ..persistence.response_cache import ResponseCache
 from ..models.specification import ModuleSpecification
-from ..utils.project_management import calculate_output_path
+from ..utils.project_management import calculate_output_path, write_output_files
 
 # PostgreSQL persistence is optional - only import if enabled
 try:
@@ -34,6 +36,23 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Source extension -> language, used once per module while building specifications
+_EXT_TO_LANGUAGE = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.java': 'java',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.cpp': 'cpp',
+    '.c': 'c',
+    '.rb': 'ruby',
+    '.php': 'php',
+    '.clj': 'clojure',
+    '.cljs': 'clojurescript',
+    '.cljc': 'clojure'
+}
+
 
 class HierarchicalCodebaseTranslatorWorkflow:
     """Enhanced workflow with hierarchical analysis and agent-specific checkpointing."""
@@ -65,9 +84,12 @@ class HierarchicalCodebaseTranslatorWorkflow:
             'model_name': self.config.get('documenter', {}).get('model_name', 'claude-3-5-sonnet-20241022'),
             'temperature': 0.0
         }
+        # One cache connection shared by every agent that caches LLM or parser results
+        response_cache = ResponseCache.for_checkpoint_dir(self.checkpoint_manager.checkpoint_dir)
         
         self.project_analyzer = ProjectAnalyzerAgent(
             checkpoint_manager=self.checkpoint_manager,
+            response_cache=response_cache,
             **self.config.get('project_analyzer', base_config)
         )
 
@@ -78,6 +100,7 @@ class HierarchicalCodebaseTranslatorWorkflow:
         
         self.traverser = TraverserAgent(
             checkpoint_manager=self.checkpoint_manager,
+            response_cache=response_cache,
             **self.config.get('traverser', base_config)
         )
         
@@ -89,6 +112,7 @@ class HierarchicalCodebaseTranslatorWorkflow:
         
         self.function_extractor = FunctionExtractorAgent(
             checkpoint_manager=self.checkpoint_manager,
+            response_cache=response_cache,
             **self.config.get('function_extractor', base_config)
         )
         
@@ -100,6 +124,7 @@ class HierarchicalCodebaseTranslatorWorkflow:
         
         self.translator = TranslatorAgent(
             checkpoint_manager=self.checkpoint_manager,
+            response_cache=response_cache,
             language_settings=self.config.get('language_settings', {}),
             **self.config.get('translator', base_config)
         )
@@ -318,16 +343,7 @@ class HierarchicalCodebaseTranslatorWorkflow:
             scaffolding_files = arch_translation.get('scaffolding_files', {})
             if scaffolding_files:
                 output_path = Path(state.get('target_output_path', state.get('output_path', 'translated')))
-                output_path.mkdir(parents=True, exist_ok=True)
-
-                files_written = 0
-                for file_path, content in scaffolding_files.items():
-                    full_path = output_path / file_path
-                    full_path.parent.mkdir(parents=True, exist_ok=True)
-                    with open(full_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    files_written += 1
-
+                files_written = await write_output_files(output_path, scaffolding_files)
                 logger.info(f"Generated {files_written} scaffolding files in {output_path}")
 
         except Exception as e:
@@ -629,54 +645,47 @@ class HierarchicalCodebaseTranslatorWorkflow:
             # Initialize translation state
             if 'translation_state' not in state:
                 state['translation_state'] = {
-                    'translated_modules': {},
+                    'codes': {},
+                    'output_paths': {},
                     'errors': []
                 }
             
-            # Translate each module specification
-            for module_spec in module_specifications:
-                logger.info(f"Translating module: {module_spec.module_name}")
-                
-                # Set current module for translator
-                state['current_module'] = module_spec
-                
-                try:
-                    # Process with translator
-                    state = await self.translator.process(state)
-                    
-                    if state.get('errors'):
-                        logger.warning(f"Errors encountered: {state['errors']}")
-                        
-                except Exception as e:
-                    logger.error(f"Error translating module {module_spec.module_name}: {e}")
-                    state['errors'].append({"module": module_spec.module_name, "error": str(e)})
+            # Translate all module specifications concurrently, or via the provider Batch API
+            logger.info(f"Translating {len(module_specifications)} modules")
+            if state.get('config', {}).get('batch_mode'):
+                state = await self.translator.translate_all_batch(state, module_specifications)
+            else:
+                state = await self.translator.process_batch(state, module_specifications)
+            
+            if state.get('errors'):
+                logger.warning(f"Errors encountered: {state['errors']}")
             
             # Clear current_module after translation
             state['current_module'] = None
             
             translation_state = state.get('translation_state', {})
-            translated_modules = translation_state.get('translated_modules', {})
-            logger.info(f"Translation completed: {len(translated_modules)} modules")
+            codes = translation_state.get('codes', {})
+            output_paths = translation_state.get('output_paths', {})
+            logger.info(f"Translation completed: {len(codes)} modules")
             
             # Save translated modules to files
-            if translated_modules and not state.get('translation_skipped'):
+            if codes and not state.get('translation_skipped'):
                 output_path = Path(state.get('target_output_path', './translated_output'))
                 output_path.mkdir(parents=True, exist_ok=True)
                 
-                for module_path, translation_data in translated_modules.items():
-                    if isinstance(translation_data, dict) and 'code' in translation_data:
-                        code_content = translation_data['code']
-                        target_file_path = translation_data.get('output_path', module_path)
-
-                        target_file = Path(target_file_path)
-                        target_file.parent.mkdir(parents=True, exist_ok=True)
+                # Modules share a handful of directories; create each one once
+                created_dirs = set()
+                for module_path, code_content in codes.items():
+                    target_file = output_paths.get(module_path, module_path)
+                    target_dir = os.path.dirname(target_file)
+                    if target_dir and target_dir not in created_dirs:
+                        os.makedirs(target_dir, exist_ok=True)
+                        created_dirs.add(target_dir)
 
-                        with open(target_file, 'w', encoding='utf-8') as f:
-                            f.write(code_content)
+                    with open(target_file, 'w', encoding='utf-8') as f:
+                        f.write(code_content)
 
-                        logger.info(f"Saved translated module to {target_file}")
-                    else:
-                        logger.warning(f"Invalid translation data for {module_path}: {translation_data}")
+                    logger.info(f"Saved translated module to {target_file}")
                 
                 logger.info(f"Translated code saved to {output_path}")
             
@@ -689,23 +698,8 @@ class HierarchicalCodebaseTranslatorWorkflow:
     
     def _detect_language_from_path(self, file_path: str) -> str:
         """Detect programming language from file extension."""
-        ext_mapping = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.java': 'java',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.cpp': 'cpp',
-            '.c': 'c',
-            '.rb': 'ruby',
-            '.php': 'php',
-            '.clj': 'clojure',
-            '.cljs': 'clojurescript',
-            '.cljc': 'clojure'
-        }
-        ext = Path(file_path).suffix
-        return ext_mapping.get(ext, 'unknown')
+        ext = os.path.splitext(file_path)[1]
+        return _EXT_TO_LANGUAGE.get(ext, 'unknown')
     
     
     def _collect_errors(self, final_state: OrchestratorState) -> List[Dict[str, Any]]:
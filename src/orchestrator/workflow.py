@@ -136,7 +136,8 @@ class CodebaseTranslatorWorkflow:
             'source_spec': codebase_spec,
             'target_language': state['target_language'],
             'current_module': None,
-            'translated_modules': {},
+            'codes': {},
+            'output_paths': {},
             'translation_mapping': {},
             'output_path': state.get('config', {}).get('output_path', 'translated'),
             'errors': [],
@@ -157,12 +158,13 @@ class CodebaseTranslatorWorkflow:
         
         translation_state = state['translation_state']
         
-        for original_path, translation_data in translation_state['translated_modules'].items():
-            output_path = Path(translation_data['output_path'])
+        codes = translation_state['codes']
+        for original_path, output_path in translation_state['output_paths'].items():
+            output_path = Path(output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
             with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(translation_data['code'])
+                f.write(codes[original_path])
             
             logger.info(f"Saved translated module: {output_path}")
         
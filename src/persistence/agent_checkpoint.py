@@ -1,7 +1,6 @@
 """
 Agent-specific checkpoint management for granular recovery.
 """
-import json
 import hashlib
 from pathlib import Path
 from typing import Dict, Any, Optional, List
@@ -9,6 +8,8 @@ from datetime import datetime
 from pydantic import BaseModel, Field
 import logging
 
+from ..utils.serialization import dumps, loads
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,7 +29,8 @@ class CheckpointManager:
     
     def __init__(self, workflow_id: str, checkpoint_dir: str = ".codebase_translator"):
         self.workflow_id = workflow_id
-        self.base_dir = Path(checkpoint_dir) / f"workflow_{workflow_id}"
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.base_dir = self.checkpoint_dir / f"workflow_{workflow_id}"
         self.base_dir.mkdir(parents=True, exist_ok=True)
         
     def _get_agent_checkpoint_path(self, agent_name: str, suffix: str = "") -> Path:
@@ -42,15 +44,26 @@ class CheckpointManager:
         state: Dict[str, Any], 
         progress: Optional[Dict[str, Any]] = None,
         phase: str = "processing",
-        parent_id: Optional[str] = None
+        parent_id: Optional[str] = None,
+        incremental: bool = False
     ) -> str:
-        """Save an agent's current state to checkpoint."""
+        """Save an agent's current state to checkpoint.
+        
+        With incremental=True each top-level state field is stored in its own file
+        and rewritten only when its content hash differs from the previous save.
+        """
+        metadata = {}
+        if incremental:
+            metadata['field_hashes'] = self._save_state_fields(agent_name, state)
+            state = {}
+        
         checkpoint = AgentCheckpoint(
             agent_name=agent_name,
             agent_phase=phase,
             state=state,
             progress=progress or {},
-            parent_checkpoint_id=parent_id
+            parent_checkpoint_id=parent_id,
+            metadata=metadata
         )
         
         checkpoint_path = self._get_agent_checkpoint_path(agent_name)
@@ -58,10 +71,10 @@ class CheckpointManager:
         with open(checkpoint_path, 'w', encoding='utf-8') as f:
             try:
                 # Pydantic v2
-                json.dump(checkpoint.model_dump(mode='json'), f, indent=2, default=str)
+                f.write(dumps(checkpoint.model_dump(mode='json'), indent=True))
             except AttributeError:
                 # Pydantic v1 fallback
-                json.dump(checkpoint.dict(default=str), f, indent=2)
+                f.write(dumps(checkpoint.dict(default=str), indent=True))
         
         logger.debug(f"Saved checkpoint for {agent_name} at {checkpoint_path}")
         return str(checkpoint_path)
@@ -75,18 +88,75 @@ class CheckpointManager:
         
         try:
             with open(checkpoint_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                data = loads(f.read())
             
             # Convert timestamp string back to datetime
             if 'timestamp' in data and isinstance(data['timestamp'], str):
                 data['timestamp'] = datetime.fromisoformat(data['timestamp'])
             
+            field_hashes = data.get('metadata', {}).get('field_hashes')
+            if field_hashes:
+                fields_dir = self._get_agent_fields_dir(agent_name)
+                for field in field_hashes:
+                    with open(fields_dir / f"{field}.json", 'r', encoding='utf-8') as f:
+                        data['state'][field] = loads(f.read())
+            
             return AgentCheckpoint(**data)
         
         except Exception as e:
             logger.error(f"Failed to load checkpoint for {agent_name}: {e}")
             return None
     
+    def _get_agent_fields_dir(self, agent_name: str) -> Path:
+        """Directory holding one file per state field for incremental checkpoints."""
+        return self.base_dir / f"{agent_name}_fields"
+    
+    def _save_state_fields(self, agent_name: str, state: Dict[str, Any]) -> Dict[str, str]:
+        """Write state fields whose content changed since the last save and return field -> hash."""
+        previous = self._load_checkpoint_metadata(agent_name).get('field_hashes', {})
+        fields_dir = self._get_agent_fields_dir(agent_name)
+        fields_dir.mkdir(exist_ok=True)
+        
+        hashes = {}
+        for field, value in state.items():
+            payload = self._encode_field(value)
+            digest = hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+            hashes[field] = digest
+            field_path = fields_dir / f"{field}.json"
+            if previous.get(field) != digest or not field_path.exists():
+                with open(field_path, 'w', encoding='utf-8') as f:
+                    f.write(payload)
+        
+        # Drop files for fields no longer present in the state
+        for stale in previous.keys() - hashes.keys():
+            (fields_dir / f"{stale}.json").unlink(missing_ok=True)
+        
+        return hashes
+    
+    @staticmethod
+    def _encode_field(value: Any) -> str:
+        """Serialize one state field; pydantic models are encoded in a single model_dump_json pass."""
+        if isinstance(value, BaseModel):
+            try:
+                # Pydantic v2
+                return value.model_dump_json(indent=2)
+            except AttributeError:
+                # Pydantic v1 fallback
+                return dumps(value.dict(), indent=True)
+        return dumps(value, indent=True)
+    
+    def _load_checkpoint_metadata(self, agent_name: str) -> Dict[str, Any]:
+        """Read only a checkpoint's metadata, without reassembling incremental fields."""
+        checkpoint_path = self._get_agent_checkpoint_path(agent_name)
+        if not checkpoint_path.exists():
+            return {}
+        try:
+            with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                return loads(f.read()).get('metadata', {})
+        except Exception as e:
+            logger.debug(f"Could not read checkpoint metadata for {agent_name}: {e}")
+            return {}
+    
     def get_resume_point(self, agent_name: str) -> Dict[str, Any]:
         """Get the resume point for an agent."""
         checkpoint = self.load_agent_state(agent_name)
@@ -110,6 +180,10 @@ class CheckpointManager:
         
         if checkpoint_path.exists():
             checkpoint_path.unlink()
+            fields_dir = self._get_agent_fields_dir(agent_name)
+            if fields_dir.exists():
+                import shutil
+                shutil.rmtree(fields_dir)
             logger.debug(f"Cleaned up checkpoint for {agent_name}")
             return True
         
@@ -173,10 +247,10 @@ class CheckpointManager:
         with open(checkpoint_path, 'w', encoding='utf-8') as f:
             try:
                 # Pydantic v2
-                json.dump(checkpoint.model_dump(mode='json'), f, indent=2, default=str)
+                f.write(dumps(checkpoint.model_dump(mode='json'), indent=True))
             except AttributeError:
                 # Pydantic v1 fallback
-                json.dump(checkpoint.dict(default=str), f, indent=2)
+                f.write(dumps(checkpoint.dict(default=str), indent=True))
         
         logger.debug(f"Saved batch checkpoint for {agent_name} batch {batch_id}")
         return str(checkpoint_path)
@@ -192,7 +266,7 @@ class CheckpointManager:
         for batch_file in sorted(batch_dir.glob("batch_*.json")):
             try:
                 with open(batch_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                    data = loads(f.read())
                 
                 if 'timestamp' in data and isinstance(data['timestamp'], str):
                     data['timestamp'] = datetime.fromisoformat(data['timestamp'])
@@ -251,10 +325,10 @@ class WorkflowCheckpoint(BaseModel):
         with open(checkpoint_path, 'w', encoding='utf-8') as f:
             try:
                 # Pydantic v2
-                json.dump(self.model_dump(mode='json'), f, indent=2, default=str)
+                f.write(dumps(self.model_dump(mode='json'), indent=True))
             except AttributeError:
                 # Pydantic v1 fallback
-                json.dump(self.dict(default=str), f, indent=2)
+                f.write(dumps(self.dict(default=str), indent=True))
         
         logger.info(f"Saved workflow checkpoint at {checkpoint_path}")
         return str(checkpoint_path)
@@ -269,7 +343,7 @@ class WorkflowCheckpoint(BaseModel):
         
         try:
             with open(checkpoint_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                data = loads(f.read())
             
             if 'timestamp' in data and isinstance(data['timestamp'], str):
                 data['timestamp'] = datetime.fromisoformat(data['timestamp'])
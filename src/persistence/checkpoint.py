@@ -130,7 +130,8 @@ class WorkflowCheckpoint:
             translation = state['translation_state']
             serializable['translation_state'] = {
                 'target_language': translation.get('target_language'),
-                'translated_modules': translation.get('translated_modules', {}),
+                'codes': translation.get('codes', {}),
+                'output_paths': translation.get('output_paths', {}),
                 'translation_mapping': translation.get('translation_mapping', {}),
                 'output_path': translation.get('output_path'),
                 'errors': translation.get('errors', []),
@@ -239,9 +240,17 @@ class WorkflowCheckpoint:
         # Deserialize translation_state if present
         if data.get('translation_state'):
             translation_data = data['translation_state']
+            codes = translation_data.get('codes', {})
+            output_paths = translation_data.get('output_paths', {})
+            # Checkpoints written before codes/output_paths were split keep finished work per module
+            for file_path, module in translation_data.get('translated_modules', {}).items():
+                codes.setdefault(file_path, module.get('code', ''))
+                if module.get('output_path'):
+                    output_paths.setdefault(file_path, module['output_path'])
             state['translation_state'] = {
                 'target_language': translation_data['target_language'],
-                'translated_modules': translation_data['translated_modules'],
+                'codes': codes,
+                'output_paths': output_paths,
                 'translation_mapping': translation_data['translation_mapping'],
                 'output_path': translation_data['output_path'],
                 'errors': translation_data['errors'],
@@ -0,0 +1,87 @@
+"""
+Content-addressed cache for agent results that persists across runs.
+"""
+import json
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """SQLite-backed key/value store for LLM and parser results keyed by content hash.
+
+    Safe to share across asyncio.to_thread workers: every statement runs under one lock.
+    """
+
+    _shared: Dict[Path, 'ResponseCache'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, cache_path: Union[str, Path] = ".codebase_translator/response_cache.sqlite"):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "namespace TEXT NOT NULL, "
+            "key TEXT NOT NULL, "
+            "value TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def for_checkpoint_dir(cls, checkpoint_dir: Union[str, Path]) -> 'ResponseCache':
+        """Return the process-wide cache stored under a checkpoint directory, opening it once."""
+        cache_path = (Path(checkpoint_dir) / "response_cache.sqlite").resolve()
+        with cls._shared_lock:
+            cache = cls._shared.get(cache_path)
+            if cache is None:
+                cache = cls._shared[cache_path] = cls(cache_path)
+            return cache
+
+    @staticmethod
+    def make_key(*parts: Union[str, bytes]) -> str:
+        """Build a stable 128-bit key from NUL-separated parts."""
+        hasher = hashlib.blake2b(digest_size=16)
+        for i, part in enumerate(parts):
+            if i:
+                hasher.update(b'\0')
+            hasher.update(part.encode('utf-8') if isinstance(part, str) else part)
+        return hasher.hexdigest()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM response_cache WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.warning(f"Response cache read failed for {namespace}/{key}: {e}")
+            return None
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        """Store a JSON-serializable value."""
+        try:
+            payload = json.dumps(value, default=str)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (namespace, key, value) VALUES (?, ?, ?)",
+                    (namespace, key, payload)
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.warning(f"Response cache write failed for {namespace}/{key}: {e}")
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,82 @@
+"""
+Append-only JSONL journal of translated modules with an async write-behind queue.
+"""
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import logging
+
+from ..utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationJournal:
+    """Records each translated module as one JSON line so interrupted runs can resume."""
+
+    def __init__(self, journal_path: Union[str, Path], batch_size: int = 64):
+        self.journal_path = Path(journal_path)
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Replay the journal into a file_path -> row mapping; later rows win."""
+        rows: Dict[str, Dict[str, Any]] = {}
+        if not self.journal_path.exists():
+            return rows
+
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    row = loads(line)
+                except ValueError:
+                    # A crash mid-append leaves at most one partial trailing line
+                    logger.warning(f"Skipping unreadable journal line in {self.journal_path}")
+                    continue
+                rows[row['file_path']] = row
+        return rows
+
+    async def record(self, row: Dict[str, Any]) -> None:
+        """Queue a row for writing without blocking on disk I/O."""
+        if self._writer_task is None or self._writer_task.done():
+            self._queue = asyncio.Queue()
+            self._writer_task = asyncio.create_task(self._drain())
+        await self._queue.put(row)
+
+    async def flush(self) -> None:
+        """Write everything queued so far and stop the writer."""
+        writer = self._writer_task
+        if writer is None:
+            return
+        await self._queue.put(None)
+        await writer
+        # record() may have started a new writer while this one drained; leave that one running
+        if self._writer_task is writer:
+            self._writer_task = None
+
+    async def _drain(self) -> None:
+        stopping = False
+        while True:
+            batch: List[Dict[str, Any]] = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            if None in batch:
+                stopping = True
+                batch = [row for row in batch if row is not None]
+            if batch:
+                try:
+                    await asyncio.to_thread(self._append, batch)
+                except Exception as e:
+                    logger.error(f"Failed to append {len(batch)} rows to {self.journal_path}: {e}")
+            # Rows recorded behind the stop marker are written first; nothing awaits between this
+            # check and the task finishing, so no row can be left in the queue
+            if stopping and self._queue.empty():
+                return
+
+    def _append(self, batch: List[Dict[str, Any]]) -> None:
+        payload = ''.join(dumps(row) + '\n' for row in batch)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(payload)
@@ -334,9 +334,13 @@ class ArchitectureGuidance:
         self,
         source_framework: str,
         source_language: str,
-        target_language: str
+        target_language: str,
+        allow_fallback: bool = True
     ) -> Optional[Tuple[FrameworkInfo, FrameworkMapping]]:
-        """Find the best target framework for migration."""
+        """Find the best target framework for migration.
+
+        With allow_fallback=False only curated mappings are returned, never a same-category guess.
+        """
         source_key = f"{source_language}/{source_framework}"
         source_info = self.frameworks.get(source_key)
 
@@ -356,6 +360,9 @@ class ArchitectureGuidance:
         if best_mapping:
             return (best_mapping.target, best_mapping)
 
+        if not allow_fallback:
+            return None
+
         # Fallback: find any framework in target language with same category
         for framework_key, framework_info in self.frameworks.items():
             if framework_info.language == target_language and \
@@ -486,5 +493,24 @@ class ArchitectureGuidance:
         })
 
 
+def normalize_dependencies(dependencies: List[Any]) -> Tuple[List[str], List[str]]:
+    """
+    Split LLM-produced dependency entries (dicts or plain strings) into parallel name/purpose lists.
+
+    Done once when the architecture translation is stored so per-module consumers
+    can zip the lists without re-checking each entry's shape.
+    """
+    names = []
+    purposes = []
+    for dep in dependencies or []:
+        if isinstance(dep, dict):
+            names.append(dep.get('name', 'unknown'))
+            purposes.append(dep.get('purpose', ''))
+        else:
+            names.append(str(dep))
+            purposes.append('')
+    return names, purposes
+
+
 # Singleton instance
 architecture_guidance = ArchitectureGuidance()
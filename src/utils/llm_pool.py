@@ -0,0 +1,81 @@
+"""
+Least-loaded routing of LLM requests across several endpoints with failover.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+import logging
+
+from langchain_core.runnables import Runnable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolEndpoint:
+    """One backend in the pool and its live load/health counters."""
+    name: str
+    runnable: Runnable
+    concurrency_limit: int = 8
+    in_flight: int = 0
+    failures: int = 0
+    unhealthy_until: float = 0.0
+
+
+class LLMClientPool:
+    """Dispatches each request to the least-loaded healthy endpoint, retrying elsewhere on failure."""
+
+    def __init__(self, endpoints: List[PoolEndpoint], backoff_seconds: float = 5.0, max_backoff_seconds: float = 120.0):
+        if not endpoints:
+            raise ValueError("LLMClientPool requires at least one endpoint")
+        self.endpoints = endpoints
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._condition: Optional[asyncio.Condition] = None
+
+    async def submit(self, inputs: Dict[str, Any]) -> Any:
+        """Invoke the request on the pool; raises the last error once every endpoint has failed it."""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+
+        tried: Set[str] = set()
+        last_error: Optional[Exception] = None
+        while True:
+            endpoint = await self._acquire(tried)
+            if endpoint is None:
+                raise last_error
+            try:
+                result = await endpoint.runnable.ainvoke(inputs)
+                endpoint.failures = 0
+                return result
+            except Exception as e:
+                last_error = e
+                tried.add(endpoint.name)
+                endpoint.failures += 1
+                backoff = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (endpoint.failures - 1))
+                endpoint.unhealthy_until = time.monotonic() + backoff
+                logger.warning(f"LLM endpoint {endpoint.name} failed ({e}); backing off {backoff:.0f}s")
+            finally:
+                async with self._condition:
+                    endpoint.in_flight -= 1
+                    self._condition.notify_all()
+
+    async def _acquire(self, tried: Set[str]) -> Optional[PoolEndpoint]:
+        """Reserve a slot on the least-loaded endpoint not yet tried, waiting while all are full."""
+        async with self._condition:
+            while True:
+                candidates = [e for e in self.endpoints if e.name not in tried]
+                if not candidates:
+                    return None
+
+                # Prefer healthy endpoints, but fall back to backed-off ones rather than failing outright
+                now = time.monotonic()
+                healthy = [e for e in candidates if e.unhealthy_until <= now] or candidates
+                available = [e for e in healthy if e.in_flight < e.concurrency_limit]
+                if available:
+                    endpoint = min(available, key=lambda e: e.in_flight / e.concurrency_limit)
+                    endpoint.in_flight += 1
+                    return endpoint
+
+                await self._condition.wait()
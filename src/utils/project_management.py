@@ -1,8 +1,9 @@
 """
 Utility functions for project management and output path calculation.
 """
+import asyncio
 from pathlib import Path
-from typing import Union
+from typing import Dict, Union
 
 
 def generate_project_identifier(project_root: Union[str, Path], target_language: str) -> str:
@@ -37,4 +38,32 @@ def calculate_output_path(
         Path to project-specific output directory
     """
     project_id = generate_project_identifier(project_root, target_language)
-    return Path(output_root) / project_id
\ No newline at end of file
+    return Path(output_root) / project_id
+
+
+def _write_text(path: Path, content: str) -> None:
+    """Write content to path as UTF-8; runs in a worker thread."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+async def write_output_files(output_path: Union[str, Path], files: Dict[str, str]) -> int:
+    """
+    Write generated files under an output directory, overlapping the disk writes.
+    
+    Args:
+        output_path: Directory the relative file paths are resolved against
+        files: Relative file path -> file content
+        
+    Returns:
+        Number of files written
+    """
+    output_path = Path(output_path)
+    targets = {output_path / file_path: content for file_path, content in files.items()}
+
+    # Files share a handful of directories; create each one once before writing
+    for directory in {target.parent for target in targets} | {output_path}:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    await asyncio.gather(*[asyncio.to_thread(_write_text, target, content) for target, content in targets.items()])
+    return len(targets)
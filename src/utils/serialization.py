@@ -0,0 +1,46 @@
+"""
+JSON serialization helpers that use orjson when it is installed.
+"""
+import json
+from typing import Any
+
+from pydantic import BaseModel
+
+# orjson is optional - fall back to the standard library encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def dumps(value: Any, indent: bool = False) -> str:
+    """
+    Serialize a value to a JSON string.
+
+    Args:
+        value: JSON-compatible value; unknown types are rendered with str()
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        JSON text
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, option=option, default=str).decode('utf-8')
+    return json.dumps(value, indent=2 if indent else None, default=str)
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from str or bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def model_to_json(model: BaseModel, indent: bool = False) -> str:
+    """Serialize a pydantic model through dumps() so orjson is used when available."""
+    return dumps(model.model_dump(), indent=indent)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the package as ``src.*``, the same way ``python -m src`` runs it
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,78 @@
+"""
+Smoke tests for the gap filler's regex patterns under both regex engines.
+"""
+import importlib
+import re
+import sys
+import types
+
+import pytest
+
+import src.agents.gap_filler_agent as gap_filler_agent
+
+GO_SOURCE = '''package main
+
+import "fmt"
+import log "github.com/sirupsen/logrus"
+import (
+    "net/http"
+)
+
+func main() {
+    http.HandleFunc("/users", listUsers)
+}
+'''
+
+
+def _strict_re2() -> types.ModuleType:
+    """Stand-in with google-re2's calling convention: no flag constants, compile(pattern, options=None)."""
+    module = types.ModuleType('re2')
+
+    def compile(pattern, options=None):
+        if options is not None and not isinstance(options, module.Options):
+            raise TypeError(f"options must be re2.Options, not {type(options).__name__}")
+        return re.compile(pattern)
+
+    module.Options = type('Options', (), {})
+    module.compile = compile
+    return module
+
+
+@pytest.fixture
+def reload_with(monkeypatch):
+    """Re-import gap_filler_agent with the given module installed as re2 (None hides re2)."""
+    def reload(re2_module):
+        monkeypatch.setitem(sys.modules, 're2', re2_module)
+        return importlib.reload(gap_filler_agent)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(gap_filler_agent)
+
+
+def _assert_patterns_work(module):
+    assert module._extract_go_imports(GO_SOURCE) == {'fmt', 'github.com/sirupsen/logrus', 'net/http'}
+    assert module._GO_FUNC_RE.findall(GO_SOURCE) == ['main']
+    assert module._collect_groups(module._ENDPOINT_RES['go'], GO_SOURCE) == {'/users'}
+    assert module._collect_groups(
+        module._JS_FUNC_RE, "function a() {}\nconst b = () => 1\nconst o = { c: function () {} }"
+    ) == {'a', 'b', 'c'}
+
+
+def test_import_with_stdlib_re(reload_with):
+    module = reload_with(None)
+    assert not module.RE2_AVAILABLE
+    _assert_patterns_work(module)
+
+
+def test_import_with_re2_calling_convention(reload_with):
+    module = reload_with(_strict_re2())
+    assert module.RE2_AVAILABLE
+    _assert_patterns_work(module)
+
+
+def test_import_with_google_re2(reload_with):
+    re2 = pytest.importorskip('re2')
+    module = reload_with(re2)
+    assert module.RE2_AVAILABLE
+    _assert_patterns_work(module)
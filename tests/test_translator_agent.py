@@ -0,0 +1,30 @@
+"""
+Tests for the structural check that decides whether a non-Python translation escalates a tier.
+"""
+import pytest
+
+from src.agents.translator_agent import _brackets_balanced
+
+
+@pytest.mark.parametrize('language, code', [
+    ('go', 'func main() {\n\tfmt.Printf("(%d", n)\n}\n'),
+    ('go', "func f() rune {\n\treturn '('\n}\n"),
+    ('go', 'var usage = `usage: run [flags\n  (see docs`\n'),
+    ('javascript', 'const open = /\\(/;\nif (open.test(s)) { count++ }\n'),
+    ('javascript', 'const half = (a + b) / 2; // ratio (approx\n'),
+    ('typescript', '/* TODO: handle ) and ] */\nexport function f(): void {}\n'),
+    ('rust', "fn first<'a>(s: &'a str) -> &'a str {\n    if s.ends_with('}') { s } else { s }\n}\n"),
+    ('clojure', '(defn f [] (str \\( "[" ))\n; closes (later\n'),
+])
+def test_brackets_in_literals_and_comments_are_ignored(language, code):
+    assert _brackets_balanced(code, language)
+
+
+@pytest.mark.parametrize('language, code', [
+    # Every bracket closes when string contents are counted, but the output stops mid-string
+    ('go', 'func main() {\n\tlog.Println(")}'),
+    ('java', 'class A {\n  void f() {}\n}\n/* trailing note (}'),
+    ('javascript', 'function f() {\n  return g(1, 2;\n}\n'),
+])
+def test_truncated_or_unbalanced_output_is_rejected(language, code):
+    assert not _brackets_balanced(code, language)